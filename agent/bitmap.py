@@ -0,0 +1,74 @@
+from datetime import datetime, time, timedelta
+import numpy as np
+
+def occupancy_bitmap(busy_intervals, window_start, minutes):
+    """Mark every minute of the window covered by a (start_ts, end_ts) busy interval"""
+    if not len(busy_intervals):
+        return np.zeros(minutes, dtype=bool)
+
+    bounds = np.asarray(busy_intervals, dtype=np.int64)
+    first = np.clip((bounds[:, 0] - window_start) // 60, 0, minutes)
+    last = np.clip(-((window_start - bounds[:, 1]) // 60), 0, minutes)  # ceil division
+
+    # +1 where a busy interval opens, -1 where it closes; a running sum > 0 means busy
+    edges = np.zeros(minutes + 1, dtype=np.int32)
+    np.add.at(edges, first, 1)
+    np.add.at(edges, last, -1)
+    return np.cumsum(edges[:-1]) > 0
+
+def _local_hour(tz, day, hour):
+    """Aware wall-clock hour:00 on day, localized directly so DST-change days keep their local opening time"""
+    return tz.normalize(tz.localize(datetime.combine(day + timedelta(days=hour // 24), time(hour % 24))))
+
+def _working_days(window_start, minutes, tz, start_hour, end_hour, workdays, holidays):
+    """(opens, closes) minute offsets from window_start of each working day the window touches, unclipped"""
+    first_day = datetime.fromtimestamp(window_start, tz).date()
+    last_day = datetime.fromtimestamp(window_start + minutes * 60, tz).date()
+
+    day = first_day
+    while day <= last_day:
+        if day.weekday() in workdays and day not in holidays:
+            opens = int(_local_hour(tz, day, start_hour).timestamp())
+            closes = int(_local_hour(tz, day, end_hour).timestamp())
+            yield (opens - window_start) // 60, (closes - window_start) // 60
+        day += timedelta(days=1)
+
+def slot_grid_mask(window_start, minutes, tz, start_hour, end_hour, step_minutes, workdays=range(5), holidays=()):
+    """Mark the minutes where a slot may start: every step_minutes from each working day's local opening time"""
+    mask = np.zeros(minutes, dtype=bool)
+    for opens, closes in _working_days(window_start, minutes, tz, start_hour, end_hour, workdays, holidays):
+        # First grid point inside the window, counted from the day's opening
+        first = opens + max(0, -(opens // step_minutes)) * step_minutes
+        mask[first:min(minutes, closes):step_minutes] = True
+    return mask
+
+def free_run_starts(free, duration_minutes):
+    """Offsets i where free[i:i + duration_minutes] is entirely free"""
+    if duration_minutes > len(free):
+        return np.empty(0, dtype=np.int64)
+    counts = np.concatenate(([0], np.cumsum(free, dtype=np.int64)))
+    window = counts[duration_minutes:] - counts[:-duration_minutes]
+    return np.flatnonzero(window == duration_minutes)
+
+def find_free_slots(busy_by_calendar, window_start, window_end, duration_minutes, tz,
+                    start_hour=9, end_hour=18, step_minutes=30, workdays=range(5), holidays=(), limit=None):
+    """The first limit slot starts on the step grid where every calendar is free for the whole duration
+
+    As in the index engine, only the start has to fall inside working hours
+    before window_end; the meeting may run past closing time, so the busy
+    intervals should cover duration_minutes beyond window_end.
+    """
+    # Whole minutes, so the local grid falls on bitmap offsets
+    window_start = -(-window_start // 60) * 60
+    minutes = max(0, (window_end - window_start) // 60)
+    span = minutes + duration_minutes
+
+    busy = np.zeros(span, dtype=bool)
+    for intervals in busy_by_calendar:
+        busy |= occupancy_bitmap(intervals, window_start, span)
+
+    starts = free_run_starts(~busy, duration_minutes)
+    starts = starts[starts < minutes]
+    on_grid = slot_grid_mask(window_start, minutes, tz, start_hour, end_hour, step_minutes, workdays, holidays)
+    starts = starts[on_grid[starts]][:limit]
+    return [datetime.fromtimestamp(window_start + int(offset) * 60, tz) for offset in starts]
@@ -1,192 +1,427 @@
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-import pickle
+import logging
 import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
 from datetime import datetime, timedelta
+from itertools import islice
 import pytz
+from .clients import DEFAULT_ACCOUNT, service_pool
+from .google_api import GoogleAPIError, execute, execute_batch
+from .intervals import BusyIndex, event_bounds, merge_intervals, merge_timelines, to_epoch
+from .metrics import record_cache_lookup
+from .mirror import get_mirror, active_mirror
+from .policy import candidate_starts, get_policy
+from .progress import is_listening, report
 
-def authenticate_google():
-    SCOPES = ['https://www.googleapis.com/auth/calendar']
-    creds = None
-    
-    if os.path.exists('token.pkl'):
-        with open('token.pkl', 'rb') as token:
-            creds = pickle.load(token)
-    else:
-        flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-        creds = flow.run_local_server(port=0)
-        with open('token.pkl', 'wb') as token:
-            pickle.dump(creds, token)
-    
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+logger = logging.getLogger(__name__)
 
-def get_calendar_events(start_time, end_time):
-    """Get existing events in the specified time range"""
-    try:
-        service = authenticate_google()
-        
-        events_result = service.events().list(
-            calendarId='primary',
+# 'events' reads full event bodies via events.list; 'freebusy' asks
+# freebusy.query for busy blocks only, for many calendars per request;
+# 'mirror' reads a local SQLite copy kept current with syncToken deltas.
+AVAILABILITY_BACKEND = os.getenv('AVAILABILITY_BACKEND', 'events')
+FREEBUSY_MAX_CALENDARS = 50
+# Google recommends no more than 50 calls per batch request
+BATCH_MAX_REQUESTS = 50
+
+# 'index' walks the candidate grid against a BusyIndex; 'bitmap' builds a
+# NumPy minute-occupancy bitmap, which suits multi-week, multi-calendar searches.
+SLOT_ENGINE = os.getenv('SLOT_ENGINE', 'index')
+# Calendar timezones rarely change, so bookings skip calendars.get while the cached value is this young
+CALENDAR_TIMEZONE_TTL_SECONDS = float(os.getenv('CALENDAR_TIMEZONE_TTL_SECONDS', '3600'))
+
+_timezone_cache = {}
+_timezone_lock = threading.Lock()
+
+def authenticate_google(account=None):
+    """Return the pooled, authorized Calendar service for an account"""
+    return service_pool.get(account)
+
+def _list_events(service, start_time, end_time, calendar_id='primary'):
+    """List every event in the range, following all result pages"""
+    events = []
+    page_token = None
+    while True:
+        events_result = execute(service.events().list(
+            calendarId=calendar_id,
             timeMin=start_time.isoformat(),
             timeMax=end_time.isoformat(),
             singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+            orderBy='startTime',
+            pageToken=page_token
+        ), 'events.list')
         
-        events = events_result.get('items', [])
-        return events
-    except Exception as e:
-        print(f"Error fetching calendar events: {e}")
+        events.extend(events_result.get('items', []))
+        page_token = events_result.get('nextPageToken')
+        if not page_token:
+            return events
+
+def get_calendar_events(start_time, end_time):
+    """Get existing events in the specified time range; API failures raise GoogleAPIError"""
+    service = authenticate_google()
+    return _list_events(service, start_time, end_time)
+
+def _query_freebusy(service, start_time, end_time, calendar_ids, errors=None):
+    """Fetch busy blocks for up to FREEBUSY_MAX_CALENDARS calendars in one request"""
+    body = {
+        'timeMin': start_time.isoformat(),
+        'timeMax': end_time.isoformat(),
+        'items': [{'id': calendar_id} for calendar_id in calendar_ids]
+    }
+    result = execute(service.freebusy().query(body=body), 'freebusy.query')
+    
+    busy = {}
+    for calendar_id, info in result.get('calendars', {}).items():
+        if info.get('errors'):
+            reasons = ', '.join(error.get('reason', 'unknown') for error in info['errors'])
+            if errors is None:
+                raise GoogleAPIError(f"freebusy.query failed for {calendar_id}: {reasons}", 'freebusy.query', reason=reasons)
+            errors[calendar_id] = reasons
+            continue
+        busy[calendar_id] = merge_intervals(
+            event_bounds({'start': {'dateTime': block['start']}, 'end': {'dateTime': block['end']}})
+            for block in info.get('busy', [])
+        )
+    return busy
+
+def get_freebusy(start_time, end_time, calendar_ids=None, errors=None):
+    """Get merged (start_ts, end_ts) busy intervals per calendar using freebusy.query
+
+    Calendars that cannot be read raise GoogleAPIError, or, when an errors
+    dict is given, are left out and recorded there with Google's reasons.
+    """
+    calendar_ids = list(calendar_ids or ['primary'])
+    service = authenticate_google()
+    
+    busy = {}
+    for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+        busy.update(_query_freebusy(service, start_time, end_time, calendar_ids[i:i + FREEBUSY_MAX_CALENDARS], errors))
+    return busy
+
+def get_busy_index(start_time, end_time, calendar_ids=None, backend=None):
+    """Fetch the busy time for the whole range once into a BusyIndex"""
+    backend = backend or AVAILABILITY_BACKEND
+    calendar_ids = list(calendar_ids or ['primary'])
+    
+    if backend == 'freebusy':
+        busy = get_freebusy(start_time, end_time, calendar_ids)
+        return BusyIndex.from_merged(merge_timelines(busy.values()))
+    
+    if backend == 'mirror':
+        mirror = get_mirror()
+        service = authenticate_google()
+        intervals = []
+        for calendar_id in calendar_ids:
+            mirror.ensure_fresh(service, calendar_id)
+            intervals.extend(mirror.busy_intervals(calendar_id, start_time, end_time))
+        return BusyIndex(intervals)
+    
+    if backend != 'events':
+        raise ValueError(f"Unknown availability backend: {backend}")
+    
+    service = authenticate_google()
+    intervals = []
+    for calendar_id in calendar_ids:
+        intervals.extend(event_bounds(event) for event in _list_events(service, start_time, end_time, calendar_id))
+    return BusyIndex(intervals)
+
+def get_busy_by_calendar(start_time, end_time, calendar_ids=None, backend=None):
+    """Fetch merged (start_ts, end_ts) busy intervals separately for each calendar"""
+    backend = backend or AVAILABILITY_BACKEND
+    calendar_ids = list(calendar_ids or ['primary'])
+    
+    if backend == 'freebusy':
+        return get_freebusy(start_time, end_time, calendar_ids)
+    return {
+        calendar_id: get_busy_index(start_time, end_time, [calendar_id], backend).intervals()
+        for calendar_id in calendar_ids
+    }
+
+def check_time_slot_availability(start_time, duration_minutes=30, calendar_ids=None):
+    """Check if a specific time slot is available; API failures raise GoogleAPIError"""
+    end_time = start_time + timedelta(minutes=duration_minutes)
+    busy_index = get_busy_index(start_time, end_time, calendar_ids)
+    return busy_index.is_free(to_epoch(start_time), duration_minutes * 60)
+
+def _padded(intervals, buffer_seconds):
+    return [(start - buffer_seconds, end + buffer_seconds) for start, end in intervals]
+
+def _find_slots_bitmap(start_date, end_date, duration_minutes, calendar_ids, busy_index, policy, limit=None):
+    """Bitmap engine: OR every calendar's occupancy and scan for free runs starting on the policy's slot grid"""
+    from .bitmap import find_free_slots
+    
+    tz = policy.tzinfo
+    window_start = max(
+        policy.day_start(start_date.astimezone(tz).date()),
+        datetime.now(tz) + timedelta(seconds=1)
+    )
+    window_end = policy.day_start(end_date.astimezone(tz).date() + timedelta(days=1))
+    if window_start >= window_end:
         return []
+    
+    buffer = policy.buffer_minutes * 60
+    if busy_index is not None:
+        busy_by_calendar = [busy_index.intervals()]
+    else:
+        busy_by_calendar = get_busy_by_calendar(
+            window_start - timedelta(seconds=buffer), window_end + timedelta(minutes=duration_minutes, seconds=buffer), calendar_ids
+        ).values()
+    if buffer:
+        busy_by_calendar = [_padded(intervals, buffer) for intervals in busy_by_calendar]
+    
+    return find_free_slots(
+        busy_by_calendar, to_epoch(window_start), to_epoch(window_end), duration_minutes, tz,
+        policy.start_hour, policy.end_hour, policy.step_minutes, policy.workdays, policy.holidays, limit
+    )
+
+def iter_available_slots(start_date, end_date, duration_minutes=30, calendar_ids=None, busy_index=None, policy=None):
+    """Yield free slots in order, checking each candidate only when the caller asks for the next slot
+
+    Busy time for the whole range is read once, on the first next(), unless
+    busy_index is given.
+    """
+    if policy is None:
+        policy = get_policy(calendar_ids[0] if calendar_ids else 'primary')
+    streaming = is_listening()
+    tz = policy.tzinfo
+    candidate_ts = candidate_starts(policy, start_date, end_date, time.time())
+    if not candidate_ts:
+        return
+    
+    # With a buffer, [slot - buffer, slot + duration + buffer) has to be free
+    buffer = policy.buffer_minutes * 60
+    span = duration_minutes * 60 + 2 * buffer
+    if streaming:
+        first_day = datetime.fromtimestamp(candidate_ts[0], tz)
+        last_day = datetime.fromtimestamp(candidate_ts[-1], tz)
+        report('progress', message=f"Checking your calendar from {first_day:%A, %B %d} to {last_day:%A, %B %d}…")
+    if busy_index is None:
+        busy_index = get_busy_index(
+            datetime.fromtimestamp(candidate_ts[0] - buffer, tz),
+            datetime.fromtimestamp(candidate_ts[-1] - buffer + span, tz),
+            calendar_ids
+        )
+    
+    next_day_ts = candidate_ts[0]
+    i = 0
+    while i < len(candidate_ts):
+        slot_ts = candidate_ts[i]
+        if streaming and slot_ts >= next_day_ts:
+            day = datetime.fromtimestamp(slot_ts, tz).date()
+            next_day_ts = to_epoch(policy.day_start(day + timedelta(days=1)))
+            report('progress', message=f"Checking {day:%A}…")
+        free_ts = busy_index.next_free(slot_ts - buffer, span)
+        if free_ts == slot_ts - buffer:
+            slot = datetime.fromtimestamp(slot_ts, tz)
+            if streaming:
+                report('slot', start=slot.isoformat())
+            yield slot
+            i += 1
+        else:
+            # Skip every candidate that starts before the next free gap
+            i = bisect_left(candidate_ts, free_ts + buffer, i)
+
+def find_available_slots(start_date, end_date, duration_minutes=30, calendar_ids=None, busy_index=None, engine=None, policy=None, limit=10):
+    """Find the first limit available time slots within a date range
+
+    Slots follow the scheduling policy of the first calendar, or policy
+    when given. The search stops as soon as limit slots are found. A
+    calendar that cannot be read raises GoogleAPIError rather than
+    reporting every slot as free or none at all.
+    """
+    if (engine or SLOT_ENGINE) == 'bitmap':
+        if policy is None:
+            policy = get_policy(calendar_ids[0] if calendar_ids else 'primary')
+        available_slots = _find_slots_bitmap(start_date, end_date, duration_minutes, calendar_ids, busy_index, policy, limit)
+        for slot in available_slots:
+            report('slot', start=slot.isoformat())
+        return available_slots
+    
+    slots = iter_available_slots(start_date, end_date, duration_minutes, calendar_ids, busy_index, policy)
+    return list(islice(slots, limit))
+
+def event_body(title, description, start_time, duration_minutes, attendees=None):
+    """Build an events.insert body in wall-clock time of the primary calendar's scheduling policy timezone"""
+    policy_tz = get_policy('primary').tzinfo
+    if start_time.tzinfo is None:
+        start_time = policy_tz.localize(start_time)
+    elif start_time.tzinfo != policy_tz:
+        start_time = start_time.astimezone(policy_tz)
+    
+    end_time = policy_tz.normalize(start_time + timedelta(minutes=duration_minutes))
+    
+    body = {
+        'summary': title,
+        'description': description,
+        'start': {
+            'dateTime': start_time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'timeZone': policy_tz.zone
+        },
+        'end': {
+            'dateTime': end_time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'timeZone': policy_tz.zone
+        },
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60}, 
+                {'method': 'popup', 'minutes': 10},       
+            ],
+        },
+    }
+    if attendees:
+        body['attendees'] = [{'email': email} for email in attendees]
+    return body
 
-def check_time_slot_availability(start_time, duration_minutes=30):
-    """Check if a specific time slot is available"""
+def insert_calendar_event(title, description, start_time, duration_minutes=30, attendees=None):
+    """Insert an event and return the created event; errors propagate
+
+    The event id is chosen here, so a retried insert whose first attempt did
+    land comes back as 409 duplicate instead of booking the slot twice.
+    Attendees, given as email addresses, are sent an invitation.
+    """
+    service = authenticate_google()
+    
+    event = event_body(title, description, start_time, duration_minutes, attendees)
+    event['id'] = uuid.uuid4().hex
+    send_updates = 'all' if attendees else 'none'
+    
+    logger.debug("🕐 Original request time: %s", start_time)
+    logger.debug("📤 Sending to Google API (no timezone conversion): %s", event['start']['dateTime'])
+    logger.debug("🌍 Timezone field: %s", event['start']['timeZone'])
+    
     try:
-        end_time = start_time + timedelta(minutes=duration_minutes)
-        existing_events = get_calendar_events(start_time, end_time)
-        
-        for event in existing_events:
-            if 'dateTime' in event['start']:
-                event_start = datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00'))
-            else:
-                event_start = datetime.fromisoformat(event['start']['date'])
-                
-            if 'dateTime' in event['end']:
-                event_end = datetime.fromisoformat(event['end']['dateTime'].replace('Z', '+00:00'))
-            else:
-                event_end = datetime.fromisoformat(event['end']['date'])
-            
-            if event_start.tzinfo is None:
-                event_start = pytz.timezone('Asia/Kolkata').localize(event_start)
-            if event_end.tzinfo is None:
-                event_end = pytz.timezone('Asia/Kolkata').localize(event_end)
-            
-            if (start_time < event_end and end_time > event_start):
-                return False
-        
-        return True
-    except Exception as e:
-        print(f"Error checking availability: {e}")
-        return False
-
-def find_available_slots(start_date, end_date, duration_minutes=30):
-    """Find available time slots within a date range"""
-    available_slots = []
-    
-    working_start = 9
-    working_end = 18
-    
-    current_date = start_date.date()
-    end_date_only = end_date.date()
-    
-    while current_date <= end_date_only:
-        if current_date.weekday() < 5: 
-            for hour in range(working_start, working_end):
-                slot_time = datetime.combine(current_date, datetime.min.time().replace(hour=hour))
-                slot_time = pytz.timezone('Asia/Kolkata').localize(slot_time)
-                
-                if slot_time > datetime.now(pytz.timezone('Asia/Kolkata')):
-                    if check_time_slot_availability(slot_time, duration_minutes):
-                        available_slots.append(slot_time)
-                
-                slot_time_30 = slot_time + timedelta(minutes=30)
-                if slot_time_30.hour < working_end:
-                    if check_time_slot_availability(slot_time_30, duration_minutes):
-                        available_slots.append(slot_time_30)
-        
-        current_date += timedelta(days=1)
+        created_event = execute(
+            service.events().insert(calendarId='primary', body=event, sendUpdates=send_updates), 'events.insert'
+        )
+    except GoogleAPIError as e:
+        if e.status != 409:
+            raise
+        created_event = execute(service.events().get(calendarId='primary', eventId=event['id']), 'events.get')
+    
+    mirror = active_mirror()
+    if mirror is not None:
+        mirror.upsert_event('primary', created_event)
     
-    return available_slots[:10]  
+    logger.info("✅ Created event: %s", created_event.get('summary'))
+    logger.debug("📅 API Response start time: %s", created_event.get('start'))
+    logger.debug("📅 API Response end time: %s", created_event.get('end'))
+    logger.debug("🔗 Event link: %s", created_event.get('htmlLink'))
+    return created_event
 
-def create_calendar_event(title, description, start_time, duration_minutes=30):
+def create_calendar_event(title, description, start_time, duration_minutes=30, attendees=None):
     """Create a new calendar event using simple datetime format"""
     try:
-        service = authenticate_google()
-        
-        kolkata_tz = pytz.timezone('Asia/Kolkata')
-        if start_time.tzinfo is None:
-            start_time = kolkata_tz.localize(start_time)
-        elif start_time.tzinfo != kolkata_tz:
-            start_time = start_time.astimezone(kolkata_tz)
-        
-        end_time = start_time + timedelta(minutes=duration_minutes)
-        
-        start_datetime_str = start_time.strftime('%Y-%m-%dT%H:%M:%S')
-        end_datetime_str = end_time.strftime('%Y-%m-%dT%H:%M:%S')
-        
-        print(f"🕐 Original request time: {start_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-        print(f"📤 Sending to Google API (no timezone conversion): {start_datetime_str}")
-        print(f"🌍 Timezone field: Asia/Kolkata")
-        
-        event = {
-            'summary': title,
-            'description': description,
-            'start': {
-                'dateTime': start_datetime_str,
-                'timeZone': 'Asia/Kolkata'
-            },
-            'end': {
-                'dateTime': end_datetime_str,
-                'timeZone': 'Asia/Kolkata'
-            },
-            'reminders': {
-                'useDefault': False,
-                'overrides': [
-                    {'method': 'email', 'minutes': 24 * 60}, 
-                    {'method': 'popup', 'minutes': 10},       
-                ],
-            },
-        }
-        
-        created_event = service.events().insert(calendarId='primary', body=event).execute()
-        
-        event_link = created_event.get('htmlLink')
-        
-        print(f"✅ Created event: {created_event.get('summary')}")
-        print(f"📅 API Response start time: {created_event.get('start')}")
-        print(f"📅 API Response end time: {created_event.get('end')}")
-        print(f"🔗 Event link: {event_link}")
-        
-        return event_link
-        
+        return insert_calendar_event(title, description, start_time, duration_minutes, attendees).get('htmlLink')
     except Exception as e:
-        print(f"❌ Error creating event: {e}")
+        logger.error("❌ Error creating event: %s", e)
         return None
 
-def get_calendar_timezone():
-    """Get the primary calendar's timezone"""
+def create_calendar_events_batch(entries):
+    """Insert many events through batch HTTP requests; entries are (title, description, start_time, duration_minutes)
+
+    Returns one result per entry, in order: the created event dict, or the
+    exception that entry's insert raised, as a GoogleAPIError where it is one.
+    Event ids are chosen here, as in insert_calendar_event, so a part whose
+    earlier attempt did land comes back as the existing event.
+    """
+    service = authenticate_google()
+    bodies = {}
+    for i, (title, description, start_time, duration_minutes) in enumerate(entries):
+        bodies[str(i)] = event_body(title, description, start_time, duration_minutes)
+        bodies[str(i)]['id'] = uuid.uuid4().hex
+    requests = {
+        request_id: service.events().insert(calendarId='primary', body=body)
+        for request_id, body in bodies.items()
+    }
+    responses = execute_batch(service, requests, 'events.insert', batch_size=BATCH_MAX_REQUESTS)
+    
+    results = []
+    for i in range(len(entries)):
+        result = responses[str(i)]
+        if isinstance(result, GoogleAPIError) and result.status == 409:
+            try:
+                result = execute(service.events().get(calendarId='primary', eventId=bodies[str(i)]['id']), 'events.get')
+            except GoogleAPIError as e:
+                result = e
+        results.append(result)
+    
+    mirror = active_mirror()
+    if mirror is not None:
+        for result in results:
+            if isinstance(result, dict):
+                mirror.upsert_event('primary', result)
+    
+    logger.info("📦 Batch inserted %d/%d events", sum(isinstance(r, dict) for r in results), len(entries))
+    return results
+
+def _cached_timezone(account):
+    """The account's cached calendar timezone, or None if unknown or older than the TTL"""
+    key = account or DEFAULT_ACCOUNT
+    with _timezone_lock:
+        entry = _timezone_cache.get(key)
+        if entry is not None and time.monotonic() - entry[1] > CALENDAR_TIMEZONE_TTL_SECONDS:
+            del _timezone_cache[key]
+            entry = None
+    record_cache_lookup('calendar_timezone', entry is not None)
+    return entry[0] if entry is not None else None
+
+def _remember_timezone(account, time_zone):
+    if time_zone:
+        with _timezone_lock:
+            _timezone_cache[account or DEFAULT_ACCOUNT] = (time_zone, time.monotonic())
+
+def forget_calendar_timezone(account=None):
+    """Drop cached calendar timezones, for one account or all of them"""
+    with _timezone_lock:
+        if account is None:
+            _timezone_cache.clear()
+        else:
+            _timezone_cache.pop(account, None)
+
+def get_calendar_timezone(account=None):
+    """Get the primary calendar's timezone, cached per account for CALENDAR_TIMEZONE_TTL_SECONDS"""
+    current_tz = _cached_timezone(account)
+    if current_tz is not None:
+        return current_tz
     try:
-        service = authenticate_google()
-        calendar = service.calendars().get(calendarId='primary').execute()
+        service = authenticate_google(account)
+        calendar = execute(service.calendars().get(calendarId='primary'), 'calendars.get', account)
         current_tz = calendar.get('timeZone', 'Asia/Kolkata')
-        print(f"📍 Current calendar timezone: {current_tz}")
+        logger.debug("📍 Current calendar timezone: %s", current_tz)
+        _remember_timezone(account, current_tz)
         return current_tz
-    except Exception as e:
-        print(f"Error getting calendar timezone: {e}")
+    except GoogleAPIError as e:
+        # Safe to assume: every event body carries its own timeZone
+        logger.warning("Error getting calendar timezone: %s", e)
         return 'Asia/Kolkata'
 
-def update_calendar_timezone():
-    """Update the primary calendar timezone to Asia/Kolkata"""
+def update_calendar_timezone(time_zone='Asia/Kolkata', account=None):
+    """Update the primary calendar timezone, Asia/Kolkata by default"""
+    if _cached_timezone(account) == time_zone:
+        return time_zone
     try:
-        service = authenticate_google()
+        service = authenticate_google(account)
         
-        calendar = service.calendars().get(calendarId='primary').execute()
+        calendar = execute(service.calendars().get(calendarId='primary'), 'calendars.get', account)
         current_tz = calendar.get('timeZone')
         
-        if current_tz != 'Asia/Kolkata':
-            calendar['timeZone'] = 'Asia/Kolkata'
+        if current_tz != time_zone:
+            calendar['timeZone'] = time_zone
             
-            updated_calendar = service.calendars().update(calendarId='primary', body=calendar).execute()
+            updated_calendar = execute(service.calendars().update(calendarId='primary', body=calendar), 'calendars.update', account)
             
-            print(f"🔄 Calendar timezone updated from {current_tz} to: {updated_calendar.get('timeZone')}")
+            logger.info("🔄 Calendar timezone updated from %s to: %s", current_tz, updated_calendar.get('timeZone'))
+            _remember_timezone(account, updated_calendar.get('timeZone'))
             return updated_calendar.get('timeZone')
         else:
-            print(f"✅ Calendar timezone already set to: {current_tz}")
+            logger.debug("✅ Calendar timezone already set to: %s", current_tz)
+            _remember_timezone(account, current_tz)
             return current_tz
         
-    except Exception as e:
-        print(f"❌ Error updating calendar timezone: {e}")
+    except GoogleAPIError as e:
+        logger.warning("❌ Error updating calendar timezone: %s", e)
         return None
 
 def test_simple_event_creation():
@@ -211,12 +446,12 @@ def test_simple_event_creation():
             },
         }
         
-        created_event = service.events().insert(calendarId='primary', body=event).execute()
-        print(f"🧪 Test event created: {created_event.get('htmlLink')}")
-        print(f"🧪 Should show 2:00 PM - 2:30 PM on June 29")
+        created_event = execute(service.events().insert(calendarId='primary', body=event), 'events.insert', idempotent=False)
+        logger.info("🧪 Test event created: %s", created_event.get('htmlLink'))
+        logger.info("🧪 Should show 2:00 PM - 2:30 PM on June 29")
         
         return created_event.get('htmlLink')
         
     except Exception as e:
-        print(f"❌ Error creating test event: {e}")
+        logger.error("❌ Error creating test event: %s", e)
         return None
@@ -0,0 +1,146 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+DEFAULT_ACCOUNT = 'default'
+# Accounts whose credentials and per-thread services stay pooled
+MAX_POOLED_CLIENTS = int(os.getenv('GOOGLE_CLIENT_POOL_SIZE', '32'))
+# Send Calendar requests to another endpoint, e.g. the local stand-in used by the load tests
+GOOGLE_API_ENDPOINT = os.getenv('GOOGLE_API_ENDPOINT')
+# Skip OAuth and send unauthenticated requests; only meaningful with a stand-in endpoint
+GOOGLE_API_ANONYMOUS = os.getenv('GOOGLE_API_ANONYMOUS', '').lower() in ('1', 'true', 'yes')
+
+_discovery_document = None
+_discovery_lock = threading.Lock()
+
+def load_discovery_document():
+    """Load the Calendar v3 discovery document once from a local copy"""
+    global _discovery_document
+
+    if _discovery_document is None:
+        with _discovery_lock:
+            if _discovery_document is None:
+                path = os.getenv('GOOGLE_CALENDAR_DISCOVERY_FILE')
+                if path:
+                    with open(path) as f:
+                        _discovery_document = f.read()
+                else:
+                    # google-api-python-client ships the document with the package
+                    from googleapiclient import discovery_cache
+                    _discovery_document = discovery_cache.get_static_doc('calendar', 'v3')
+    return _discovery_document
+
+def token_path(account=DEFAULT_ACCOUNT):
+    """Token file for an account; the default account keeps the original token.pkl"""
+    if account in (None, DEFAULT_ACCOUNT):
+        return 'token.pkl'
+    return f'token_{account}.pkl'
+
+def _save_credentials(account, creds):
+    with open(token_path(account), 'wb') as token:
+        pickle.dump(creds, token)
+
+def _load_credentials(account):
+    """Read stored credentials for an account, running the OAuth flow if there are none"""
+    if GOOGLE_API_ANONYMOUS:
+        from google.auth.credentials import AnonymousCredentials
+        return AnonymousCredentials()
+
+    path = token_path(account)
+    if os.path.exists(path):
+        with open(path, 'rb') as token:
+            return pickle.load(token)
+
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
+    creds = flow.run_local_server(port=0)
+    _save_credentials(account, creds)
+    return creds
+
+def _refresh_if_expired(account, creds):
+    """Refresh expired credentials in place so the pooled service keeps working"""
+    if creds is not None and creds.expired and creds.refresh_token:
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+        _save_credentials(account, creds)
+
+class _AccountClients:
+    """One account's credentials and its per-thread services, behind the account's own lock"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.credentials = None
+        self.services = {}
+
+class ServicePool:
+    """Long-lived authorized Calendar services keyed by account, with LRU eviction
+
+    The Google client libraries are imported on first use, not at import time.
+    httplib2 transports are not thread-safe, so each worker thread gets its own
+    service per account; the credentials behind them are shared per account.
+    max_size bounds accounts, not threads: an evicted account takes its
+    credentials and every thread's service with it.
+    """
+
+    def __init__(self, max_size=MAX_POOLED_CLIENTS):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._installed = {}
+        self._lock = threading.Lock()
+
+    def _account_entry(self, account):
+        with self._lock:
+            entry = self._entries.get(account)
+            if entry is None:
+                entry = self._entries[account] = _AccountClients()
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(account)
+            return entry
+
+    def get(self, account=DEFAULT_ACCOUNT):
+        account = account or DEFAULT_ACCOUNT
+        if account in self._installed:
+            return self._installed[account]
+
+        entry = self._account_entry(account)
+        thread = threading.get_ident()
+        # Loading or refreshing one account's token, or its OAuth flow, only waits on that account
+        with entry.lock:
+            if entry.credentials is None:
+                entry.credentials = _load_credentials(account)
+            _refresh_if_expired(account, entry.credentials)
+            service = entry.services.get(thread)
+
+        if service is None:
+            from googleapiclient.discovery import build_from_document
+            client_options = {'api_endpoint': GOOGLE_API_ENDPOINT} if GOOGLE_API_ENDPOINT else None
+            service = build_from_document(
+                load_discovery_document(), credentials=entry.credentials, client_options=client_options
+            )
+            with entry.lock:
+                entry.services[thread] = service
+
+        return service
+
+    def put(self, account, service):
+        """Serve a ready-made service for an account from every thread"""
+        self._installed[account or DEFAULT_ACCOUNT] = service
+
+    def evict(self, account=DEFAULT_ACCOUNT):
+        with self._lock:
+            self._entries.pop(account, None)
+            self._installed.pop(account, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._installed.clear()
+
+    def __len__(self):
+        return sum(len(entry.services) for entry in list(self._entries.values())) + len(self._installed)
+
+service_pool = ServicePool()
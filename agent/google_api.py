@@ -0,0 +1,302 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from .clients import DEFAULT_ACCOUNT
+from .metrics import record_google_call, record_throttled
+
+logger = logging.getLogger(__name__)
+
+# Client-side limits in requests per minute, as shown on the Cloud console
+# quota page; 0 turns a limit off.
+GOOGLE_API_PROJECT_QPM = float(os.getenv('GOOGLE_API_PROJECT_QPM', '10000'))
+GOOGLE_API_USER_QPM = float(os.getenv('GOOGLE_API_USER_QPM', '600'))
+# Seconds of quota a bucket can save up and spend at once
+GOOGLE_API_BURST_SECONDS = float(os.getenv('GOOGLE_API_BURST_SECONDS', '2'))
+# Longest a request waits for client-side quota before failing with ThrottledError
+GOOGLE_API_THROTTLE_WAIT_SECONDS = float(os.getenv('GOOGLE_API_THROTTLE_WAIT_SECONDS', '5'))
+# Per request: attempts, including the first, and wall time across all of them
+GOOGLE_API_MAX_ATTEMPTS = int(os.getenv('GOOGLE_API_MAX_ATTEMPTS', '4'))
+GOOGLE_API_RETRY_DEADLINE_SECONDS = float(os.getenv('GOOGLE_API_RETRY_DEADLINE_SECONDS', '15'))
+GOOGLE_API_BACKOFF_BASE_SECONDS = float(os.getenv('GOOGLE_API_BACKOFF_BASE_SECONDS', '0.5'))
+GOOGLE_API_BACKOFF_MAX_SECONDS = float(os.getenv('GOOGLE_API_BACKOFF_MAX_SECONDS', '8'))
+# Process-wide: retries may add at most this fraction to first attempts, so
+# an outage does not turn into a retry storm against the quota
+GOOGLE_API_RETRY_RATIO = float(os.getenv('GOOGLE_API_RETRY_RATIO', '0.2'))
+
+_RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+_QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+class GoogleAPIError(Exception):
+    """A Google API request that failed, after any retries"""
+    retryable = False
+    outcome = 'error'
+
+    def __init__(self, message, endpoint=None, status=None, reason=None, retry_after=None):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+class RateLimitError(GoogleAPIError):
+    """429 or 403 rateLimitExceeded: Google did not act on the request, so it is safe to retry"""
+    retryable = True
+    outcome = 'rate_limited'
+
+class ThrottledError(RateLimitError):
+    """The client-side token bucket had no quota left within GOOGLE_API_THROTTLE_WAIT_SECONDS"""
+    retryable = False
+
+class QuotaExceededError(GoogleAPIError):
+    """403 quotaExceeded or dailyLimitExceeded; retrying will not help until the quota resets"""
+    outcome = 'quota_exceeded'
+
+class BackendError(GoogleAPIError):
+    """5xx responses and transport failures"""
+    retryable = True
+    outcome = 'unavailable'
+
+class NotFoundError(GoogleAPIError):
+    outcome = 'not_found'
+
+class GoneError(GoogleAPIError):
+    """410 Gone, e.g. an expired sync token"""
+    outcome = 'gone'
+
+def _error_details(error):
+    """(reason, message) from the JSON body of an HttpError"""
+    try:
+        body = json.loads(error.content)['error']
+    except (ValueError, KeyError, TypeError):
+        return None, str(error)
+    reasons = [item.get('reason') for item in body.get('errors', [])]
+    return (reasons[0] if reasons else body.get('status')), body.get('message', '')
+
+def _retry_after(response):
+    try:
+        return float(response.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def api_error(error, endpoint=None):
+    """Map an exception raised by a Google API request to a GoogleAPIError; None if it is not an API failure"""
+    if isinstance(error, GoogleAPIError):
+        return error
+
+    from googleapiclient.errors import HttpError
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        reason, message = _error_details(error)
+        if status == 429 or (status == 403 and reason in _RATE_LIMIT_REASONS):
+            error_class = RateLimitError
+        elif status == 403 and reason in _QUOTA_REASONS:
+            error_class = QuotaExceededError
+        elif status == 404:
+            error_class = NotFoundError
+        elif status == 410:
+            error_class = GoneError
+        elif status >= 500:
+            error_class = BackendError
+        else:
+            error_class = GoogleAPIError
+        return error_class(
+            f"{endpoint} failed with {status} {reason}: {message}", endpoint, status, reason, _retry_after(error.resp)
+        )
+
+    import httplib2
+    if isinstance(error, (OSError, httplib2.HttpLib2Error)):
+        return BackendError(f"{endpoint} failed: {error!r}", endpoint)
+    return None
+
+class TokenBucket:
+    """Refills at rate tokens per second up to capacity; shared between threads"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token if one is left; otherwise return the seconds until one will be"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """Block until a token is taken; False if that would take longer than timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class RetryBudget:
+    """Retries allowed across all requests: each request earns ratio of a retry, each retry spends one"""
+
+    def __init__(self, ratio=GOOGLE_API_RETRY_RATIO, reserve=10):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = float(reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+def _bucket(qpm):
+    if qpm <= 0:
+        return None
+    rate = qpm / 60
+    return TokenBucket(rate, rate * GOOGLE_API_BURST_SECONDS)
+
+_project_bucket = _bucket(GOOGLE_API_PROJECT_QPM)
+_user_buckets = {}
+_user_buckets_lock = threading.Lock()
+_retry_budget = RetryBudget()
+
+def _throttle(endpoint, account, cost=1):
+    """Wait for cost units of per-user and per-project quota; raise ThrottledError if one does not come in time"""
+    with _user_buckets_lock:
+        key = account or DEFAULT_ACCOUNT
+        if key not in _user_buckets:
+            _user_buckets[key] = _bucket(GOOGLE_API_USER_QPM)
+        user_bucket = _user_buckets[key]
+
+    for scope, bucket in (('user', user_bucket), ('project', _project_bucket)):
+        if bucket is None:
+            continue
+        # One token at a time, so a cost above the bucket's burst is paid at the sustained rate
+        for _ in range(cost):
+            if not bucket.acquire(GOOGLE_API_THROTTLE_WAIT_SECONDS):
+                record_throttled(scope)
+                raise ThrottledError(f"{endpoint} throttled: no {scope} quota left within {GOOGLE_API_THROTTLE_WAIT_SECONDS}s", endpoint)
+
+def _backoff(attempt, error):
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+    ceiling = min(GOOGLE_API_BACKOFF_MAX_SECONDS, GOOGLE_API_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+    return max(random.uniform(0, ceiling), error.retry_after or 0)
+
+def execute(request, endpoint, account=None, idempotent=True, cost=1):
+    """Run a Google API request under the client-side quota, retrying transient failures
+
+    Rate-limit errors are always retried, since Google did not act on the
+    request; backend errors only when the request is idempotent. A failure
+    raises a GoogleAPIError subclass once the attempts, the deadline or the
+    shared retry budget run out. Each attempt is counted by endpoint and
+    outcome. cost is the quota units one attempt uses, e.g. the parts of a
+    batch request.
+    """
+    deadline = time.monotonic() + GOOGLE_API_RETRY_DEADLINE_SECONDS
+    _retry_budget.deposit()
+    attempt = 0
+    while True:
+        attempt += 1
+        _throttle(endpoint, account, cost)
+        try:
+            response = request.execute()
+        except Exception as e:
+            error = api_error(e, endpoint)
+            if error is None:
+                record_google_call(endpoint, 'error')
+                raise
+
+            retry = error.retryable and (idempotent or isinstance(error, RateLimitError))
+            delay = _backoff(attempt, error) if retry else 0
+            if (not retry or attempt >= GOOGLE_API_MAX_ATTEMPTS
+                    or time.monotonic() + delay > deadline or not _retry_budget.withdraw()):
+                record_google_call(endpoint, error.outcome)
+                raise error from e
+
+            record_google_call(endpoint, 'retried')
+            logger.warning("⏳ %s; retrying in %.2fs (attempt %d of %d)", error, delay, attempt + 1, GOOGLE_API_MAX_ATTEMPTS)
+            time.sleep(delay)
+            continue
+
+        record_google_call(endpoint)
+        return response
+
+def execute_batch(service, requests, endpoint, account=None, batch_size=50):
+    """Run {request_id: request} as batch HTTP requests, returning {request_id: response or exception}
+
+    Google charges every part against the quota, so each batch takes one
+    token per part. Parts that come back rate limited were not acted on and
+    go out again in a later batch, after a backoff, while the attempts, the
+    deadline and the shared retry budget allow. Other part failures are
+    returned as GoogleAPIError where they are one. When a whole batch
+    request fails, the chunks already sent keep their results, and that
+    chunk's parts and every unsent part get the batch's error.
+    """
+    deadline = time.monotonic() + GOOGLE_API_RETRY_DEADLINE_SECONDS
+    for _ in requests:
+        _retry_budget.deposit()
+    results = {}
+    pending = list(requests)
+    attempt = 0
+    while pending:
+        attempt += 1
+        rate_limited = {}
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+                return
+            error = api_error(exception, endpoint) or exception
+            if isinstance(error, RateLimitError):
+                rate_limited[request_id] = error
+            else:
+                results[request_id] = error
+
+        failed = None
+        for offset in range(0, len(pending), batch_size):
+            chunk = pending[offset:offset + batch_size]
+            if failed is None:
+                batch = service.new_batch_http_request(callback=on_response)
+                for request_id in chunk:
+                    batch.add(requests[request_id], request_id=request_id)
+                try:
+                    execute(batch, 'batch', account, idempotent=False, cost=len(chunk))
+                except GoogleAPIError as e:
+                    logger.warning("❌ %s; %d %s parts not sent", e, len(pending) - offset, endpoint)
+                    failed = e
+            if failed is not None:
+                results.update((request_id, failed) for request_id in chunk if request_id not in results)
+
+        pending = []
+        if failed is not None:
+            results.update(rate_limited)
+            break
+        if not rate_limited:
+            break
+        delay = max(_backoff(attempt, error) for error in rate_limited.values())
+        for request_id, error in rate_limited.items():
+            if (attempt < GOOGLE_API_MAX_ATTEMPTS and time.monotonic() + delay <= deadline
+                    and _retry_budget.withdraw()):
+                record_google_call(endpoint, 'retried')
+                pending.append(request_id)
+            else:
+                results[request_id] = error
+        if pending:
+            logger.warning("⏳ %d %s parts rate limited; retrying in %.2fs (attempt %d of %d)",
+                           len(pending), endpoint, delay, attempt + 1, GOOGLE_API_MAX_ATTEMPTS)
+            time.sleep(delay)
+    return results
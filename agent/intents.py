@@ -0,0 +1,89 @@
+import re
+from dataclasses import dataclass, field
+
+INTENTS = ('booking', 'availability', 'group_scheduling', 'confirmation', 'cancellation', 'slot_selection', 'general')
+
+# Ties go to the intent listed first
+_PRIORITY = ('slot_selection', 'confirmation', 'cancellation', 'availability', 'booking')
+_RANK = {intent: -rank for rank, intent in enumerate(_PRIORITY)}
+
+_ORDINALS = {'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5}
+
+# (pattern, intent, weight). Every rule becomes one branch of a single
+# alternation; at any position the earlier branches win, so phrases are
+# listed before the words they contain ("book it" before "book").
+_RULES = (
+    (r"(?:slot|option|number|choice)\s*#?\d+", 'slot_selection', 4.0),
+    (r"#\s*\d+\b", 'slot_selection', 4.0),
+    (r"^\d+\s*[.!)]?$", 'slot_selection', 4.0),
+    (r"(?:the\s+)?(?:first|second|third|fourth|fifth)(?:\s+(?:one|slot|option))?", 'slot_selection', 2.0),
+    (r"book it|go ahead|that works|sounds good|please do|do it", 'confirmation', 3.0),
+    (r"don'?t book|never ?mind|not now", 'cancellation', 3.0),
+    (r"yes|yeah|yep|yup|confirm\w*|sure", 'confirmation', 2.0),
+    (r"ok(?:ay)?", 'confirmation', 1.0),
+    (r"no|nope|cancel\w*|nah", 'cancellation', 2.0),
+    (r"(?:meeting|call)\s+times?", 'availability', 2.0),
+    (r"book\w*|schedul\w*|reserv\w*|set up|arrange|meet", 'booking', 3.0),
+    (r"appointments?|meetings?|calls?|sync", 'booking', 1.0),
+    (r"available|availability|free|open", 'availability', 2.0),
+    (r"when", 'availability', 1.5),
+    (r"times?|slots?", 'availability', 1.0),
+    (r"\d+", 'slot_selection', 0.5),
+)
+
+_INTENT_RE = re.compile(
+    # The prefilter rejects positions no rule can start at (mid-word, or a
+    # letter that begins no keyword) before any branch is tried. Anchored
+    # and '#' rules bring their own boundaries; the rest match whole words only.
+    r"(?<!\w)(?=[\d#abcdfgmnoprstwy])(?:"
+    + '|'.join(
+        rf"(?P<r{i}>{pattern})" if pattern[0] in '^#' else rf"(?P<r{i}>\b{pattern}\b)"
+        for i, (pattern, _, _) in enumerate(_RULES)
+    )
+    + ")"
+)
+_DIGITS_RE = re.compile(r"\d+")
+# Attendees are named by email address; a booking or availability request
+# that names any becomes group_scheduling
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+@dataclass
+class IntentResult:
+    """Best intent for an utterance, every intent's score, the slot number and any attendee emails"""
+    intent: str = 'general'
+    scores: dict = field(default_factory=dict)
+    slot_number: int = None
+    attendees: list = field(default_factory=list)
+
+    def score(self, intent):
+        return self.scores.get(intent, 0.0)
+
+def classify_intent(user_input):
+    """Score every intent in a single scan of the lower-cased input"""
+    text = user_input.lower().strip()
+    attendees = []
+    if '@' in text:
+        # Deduplicated in order; removed before scoring so "bob@meet.io" does not read as "meet"
+        attendees = list(dict.fromkeys(_EMAIL_RE.findall(text)))
+        text = _EMAIL_RE.sub(' ', text)
+
+    scores = {}
+    slot_number = None
+    for match in _INTENT_RE.finditer(text):
+        # Rule groups are the only capturing groups, so lastindex identifies the rule
+        _, intent, weight = _RULES[match.lastindex - 1]
+        scores[intent] = scores.get(intent, 0.0) + weight
+        if intent == 'slot_selection' and slot_number is None and weight >= 2.0:
+            phrase = match.group()
+            digits = _DIGITS_RE.search(phrase)
+            slot_number = int(digits.group()) if digits else next(n for word, n in _ORDINALS.items() if word in phrase)
+
+    if not scores:
+        return IntentResult(attendees=attendees)
+    best = max(scores, key=lambda intent: (scores[intent], _RANK[intent]))
+    if slot_number is None and best == 'slot_selection':
+        # Only a bare number was found, e.g. "2 please"
+        slot_number = int(_DIGITS_RE.search(text).group())
+    if attendees and best in ('booking', 'availability'):
+        best = 'group_scheduling'
+    return IntentResult(best, scores, slot_number, attendees)
@@ -0,0 +1,94 @@
+import heapq
+from bisect import bisect_right
+from datetime import datetime
+import pytz
+
+def parse_event_time(event_time):
+    """Convert an event start/end field to an aware datetime"""
+    if 'dateTime' in event_time:
+        parsed = datetime.fromisoformat(event_time['dateTime'].replace('Z', '+00:00'))
+    else:
+        parsed = datetime.fromisoformat(event_time['date'])
+    
+    if parsed.tzinfo is None:
+        # Wall-clock times are in the event's own timeZone when it gives one
+        parsed = pytz.timezone(event_time.get('timeZone', 'Asia/Kolkata')).localize(parsed)
+    return parsed
+
+def merge_intervals(intervals):
+    """Sort (start, end) intervals and merge the ones that overlap or touch"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def merge_timelines(timelines):
+    """k-way heap merge of already sorted, merged interval lists into one merged timeline
+
+    Costs O(n log k) for n intervals over k calendars, instead of sorting
+    every interval again.
+    """
+    merged = []
+    for start, end in heapq.merge(*timelines):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def to_epoch(moment):
+    """Aware datetime to integer epoch seconds"""
+    return int(moment.timestamp())
+
+def event_bounds(event):
+    """Parse an event's start and end once into epoch seconds"""
+    return to_epoch(parse_event_time(event['start'])), to_epoch(parse_event_time(event['end']))
+
+class BusyIndex:
+    """Busy time as sorted, merged epoch-second arrays queried by binary search"""
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in merge_intervals(intervals):
+            self.starts.append(start)
+            self.ends.append(end)
+
+    @classmethod
+    def from_merged(cls, intervals):
+        """Build from intervals that are already sorted and merged, skipping the merge"""
+        index = cls()
+        index.starts = [start for start, _ in intervals]
+        index.ends = [end for _, end in intervals]
+        return index
+
+    def __len__(self):
+        return len(self.starts)
+
+    def intervals(self):
+        return list(zip(self.starts, self.ends))
+
+    def is_free(self, start, duration):
+        """True if [start, start + duration) overlaps no busy interval"""
+        i = bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= start + duration
+
+    def next_free(self, start, duration):
+        """Earliest t >= start such that [t, t + duration) is free"""
+        t = start
+        i = bisect_right(self.ends, t)
+        while i < len(self.starts) and self.starts[i] < t + duration:
+            t = self.ends[i]
+            i += 1
+        return t
+
+    def add(self, start, end):
+        """Mark [start, end) busy, keeping the arrays sorted and merged"""
+        merged = merge_intervals(self.intervals() + [(start, end)])
+        self.starts = [interval[0] for interval in merged]
+        self.ends = [interval[1] for interval in merged]
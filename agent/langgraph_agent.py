@@ -1,70 +1,99 @@
+import asyncio
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-from agent.logic import parse_natural_time, suggest_time_slots, book_appointment, format_time_slots, parse_time_with_duration
+from agent.logic import parse_natural_time, search_time_slots, search_common_slots, book_appointment, format_time_slots, parse_time_with_duration, booking_duration, prefetch_availability
 import re
 from datetime import datetime, timedelta
 import pytz
+from agent.session import DEFAULT_SESSION, session_store, reset_state
+from agent.llm import general_reply
+from agent.intents import classify_intent
+from agent.progress import listen
+from agent.metrics import stage, turn
+from agent.google_api import GoogleAPIError, QuotaExceededError, RateLimitError
 
 load_dotenv()
 
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
-    raise ValueError("Missing OPENAI_API_KEY. Please make sure it's set in your .env file.")
-
-# Set the environment variable only if it's valid
-os.environ['OPENAI_API_KEY'] = str(openai_api_key)
-
-llm = ChatOpenAI(api_key=openai_api_key, temperature=0.7)
-
-
-conversation_state = {
-    'stage': 'initial',  
-    'suggested_slots': [],
-    'selected_time': None,
-    'user_intent': None,
-    'last_requested_time': None,
-    'current_user_input': None  
-}
-
-def reset_conversation_state():
-    """Reset conversation state"""
-    global conversation_state
-    conversation_state = {
-        'stage': 'initial',
-        'suggested_slots': [],
-        'selected_time': None,
-        'user_intent': None,
-        'last_requested_time': None,
-        'current_user_input': None
-    }
+logger = logging.getLogger(__name__)
+
+# Calendar and LLM calls block, so async callers run turns on this bounded pool
+# instead of on the event loop.
+AGENT_MAX_WORKERS = int(os.getenv('AGENT_MAX_WORKERS', '16'))
+_executor = ThreadPoolExecutor(max_workers=AGENT_MAX_WORKERS, thread_name_prefix='agent')
+
+# Availability is read ahead on a separate pool while the user reads the
+# slots, so background work never queues behind live turns.
+PREFETCH_ENABLED = os.getenv('AGENT_PREFETCH', '1').lower() not in ('0', 'false', 'no')
+PREFETCH_MAX_WORKERS = int(os.getenv('PREFETCH_MAX_WORKERS', '4'))
+# How long a confirmation waits for a prefetch still in flight before using what it has
+PREFETCH_WAIT_SECONDS = float(os.getenv('PREFETCH_WAIT_SECONDS', '2'))
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix='prefetch')
+
+async def run_blocking(func, *args):
+    """Await a blocking agent call on the bounded worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, func, *args)
+
+def reset_conversation_state(session_id=DEFAULT_SESSION):
+    """Reset conversation state for one session"""
+    session_store.reset(session_id)
+
+def _settled_snapshot(state):
+    """The session's newest AvailabilitySnapshot, taking over the result of a finished prefetch"""
+    future = state.get('prefetch')
+    if future is not None and future.done():
+        del state['prefetch']
+        try:
+            state['snapshot'] = future.result()
+        except Exception as e:
+            logger.debug("Prefetch not used: %r", e)
+    return state.get('snapshot')
+
+def start_prefetch(state, slots):
+    """Start settling availability for the slots the user is about to pick from or confirm
+
+    The snapshot from the slot search is reused while it is fresh, so the
+    background work usually only warms the calendar timezone.
+    """
+    if not PREFETCH_ENABLED or not slots:
+        return
+    # A prefetch already reading these slots is kept rather than started again
+    future = state.get('prefetch')
+    if future is not None and not future.done() and set(slots) <= state.get('prefetch_slots', set()):
+        return
+    duration = booking_duration(state.get('current_user_input'))
+    state['prefetch'] = _prefetch_executor.submit(
+        prefetch_availability, list(slots), duration, _settled_snapshot(state), state.get('attendees')
+    )
+    state['prefetch_slots'] = set(slots)
+
+def booking_snapshot(state):
+    """Snapshot to confirm a booking against, waiting briefly for a prefetch still in flight"""
+    future = state.get('prefetch')
+    if future is not None:
+        try:
+            future.result(timeout=PREFETCH_WAIT_SECONDS)
+        except Exception as e:
+            logger.debug("Prefetch not finished: %r", e)
+    return _settled_snapshot(state)
+
+def calendar_error_reply(error):
+    """What to tell the user when Google Calendar could not be read or written"""
+    logger.warning("📵 Calendar unavailable: %s", error)
+    if isinstance(error, (RateLimitError, QuotaExceededError)):
+        return "Google Calendar is getting too many requests right now, so I couldn't check it. Please try again in a minute."
+    return "I couldn't reach Google Calendar just now. Please try again in a moment."
 
 def detect_intent(user_input):
     """Detect user intent from input"""
-    user_input_lower = user_input.lower()
-    
-    booking_keywords = ['book', 'schedule', 'appointment', 'meeting', 'call', 'reserve']
-    availability_keywords = ['available', 'free', 'time', 'when', 'slot']
-    confirmation_keywords = ['yes', 'confirm', 'ok', 'sure', 'book it', 'that works']
-    
-    if any(keyword in user_input_lower for keyword in booking_keywords):
-        return 'booking'
-    elif any(keyword in user_input_lower for keyword in availability_keywords):
-        return 'availability'
-    elif any(keyword in user_input_lower for keyword in confirmation_keywords):
-        return 'confirmation'
-    elif re.search(r'\b\d+\b', user_input):  
-        return 'slot_selection'
-    else:
-        return 'general'
-
-def handle_booking_intent(user_input):
+    return classify_intent(user_input).intent
+
+def handle_booking_intent(user_input, state):
     """Handle booking-related requests"""
-    global conversation_state
-    
     try:
-        conversation_state['current_user_input'] = user_input
+        state['current_user_input'] = user_input
         
         time_info = parse_time_with_duration(user_input)
         
@@ -73,11 +102,12 @@ def handle_booking_intent(user_input):
             duration = time_info.get('duration', 30)
             is_range = time_info.get('is_range', False)
             
-            suggested_slots = suggest_time_slots(user_input)
+            suggested_slots, state['snapshot'] = search_time_slots(user_input)
             
             if suggested_slots and start_time in suggested_slots:
-                conversation_state['selected_time'] = start_time
-                conversation_state['stage'] = 'booking_confirmation'
+                state['selected_time'] = start_time
+                state['stage'] = 'booking_confirmation'
+                start_prefetch(state, [start_time])
                 
                 if is_range and duration > 30:
                     end_time = start_time + timedelta(minutes=duration)
@@ -88,8 +118,9 @@ def handle_booking_intent(user_input):
                     formatted_time = start_time.strftime("%A, %B %d at %I:%M %p")
                     return f"Great! I found that {formatted_time} is available. Would you like me to book this appointment for you?"
             elif suggested_slots:
-                conversation_state['suggested_slots'] = suggested_slots
-                conversation_state['stage'] = 'availability_check'
+                state['suggested_slots'] = suggested_slots
+                state['stage'] = 'availability_check'
+                start_prefetch(state, suggested_slots[:5])
                 slots_text = format_time_slots(suggested_slots)
                 
                 if is_range and duration > 30:
@@ -100,141 +131,222 @@ def handle_booking_intent(user_input):
             else:
                 return "I couldn't find any available slots for that time. Could you try a different time or date?"
         else:
-            suggested_slots = suggest_time_slots(user_input)
+            suggested_slots, state['snapshot'] = search_time_slots(user_input)
             if suggested_slots:
-                conversation_state['suggested_slots'] = suggested_slots
-                conversation_state['stage'] = 'availability_check'
+                state['suggested_slots'] = suggested_slots
+                state['stage'] = 'availability_check'
+                start_prefetch(state, suggested_slots[:5])
                 slots_text = format_time_slots(suggested_slots)
                 return f"I'd be happy to help you schedule an appointment! Here are some available time slots:\n\n{slots_text}\n\nWhich slot works best for you? Just reply with the number."
             else:
                 return "I couldn't find any available slots. Please try a different time range."
                 
+    except GoogleAPIError as e:
+        return calendar_error_reply(e)
     except Exception as e:
-        print(f"Error in handle_booking_intent: {e}")
+        logger.error("Error in handle_booking_intent: %s", e)
         return "I had trouble understanding your time request. Could you please rephrase it? For example: 'Book a meeting tomorrow at 3 PM' or 'Schedule a call between 2-4 PM next week'."
 
-def handle_availability_intent(user_input):
+def handle_availability_intent(user_input, state):
     """Handle availability check requests"""
-    global conversation_state
-    
     try:
-        suggested_slots = suggest_time_slots(user_input)
+        suggested_slots, state['snapshot'] = search_time_slots(user_input)
         
         if suggested_slots:
-            conversation_state['suggested_slots'] = suggested_slots
-            conversation_state['stage'] = 'availability_check'
+            state['suggested_slots'] = suggested_slots
+            state['stage'] = 'availability_check'
+            start_prefetch(state, suggested_slots[:5])
             slots_text = format_time_slots(suggested_slots)
             return f"Here are the available time slots:\n\n{slots_text}\n\nWould you like to book any of these? Just reply with the number."
         else:
             return "I don't have any available slots for that time period. Could you try a different time or date?"
+    except GoogleAPIError as e:
+        return calendar_error_reply(e)
     except Exception as e:
-        print(f"Error in handle_availability_intent: {e}")
+        logger.error("Error in handle_availability_intent: %s", e)
         return "I had trouble checking availability. Could you please try again?"
 
-def handle_slot_selection(user_input):
+def handle_group_intent(user_input, state, attendees):
+    """Handle requests for a time when several people are free"""
+    try:
+        state['current_user_input'] = user_input
+        found = search_common_slots(user_input, attendees)
+        
+        people = ', '.join(email for email in attendees if email not in found.unreadable) or "the attendees"
+        note = ""
+        if found.unreadable:
+            note = f"\n\n(I couldn't see the calendar of {', '.join(found.unreadable)}, so they aren't taken into account.)"
+        if not found.slots:
+            return f"I couldn't find a time when you and {people} are all free. Could you try a different day or a shorter meeting?{note}"
+        
+        state['attendees'] = attendees
+        state['snapshot'] = found.snapshot
+        if found.exact:
+            state['selected_time'] = found.slots[0]
+            state['stage'] = 'booking_confirmation'
+            start_prefetch(state, found.slots)
+            formatted_time = found.slots[0].strftime("%A, %B %d at %I:%M %p")
+            return f"Great! You and {people} are all free on {formatted_time}. Shall I book it and send the invitations?{note}"
+        
+        state['suggested_slots'] = found.slots
+        state['stage'] = 'availability_check'
+        start_prefetch(state, found.slots)
+        slots_text = format_time_slots(found.slots)
+        return f"Here are the earliest times when you and {people} are all free:\n\n{slots_text}\n\nWhich slot would you like? Just reply with the number.{note}"
+    except GoogleAPIError as e:
+        return calendar_error_reply(e)
+    except Exception as e:
+        logger.error("Error in handle_group_intent: %s", e)
+        return "I had trouble finding a common time. Could you list the attendees' email addresses and when you'd like to meet?"
+
+def handle_slot_selection(user_input, state, slot_number=None):
     """Handle slot selection by number"""
-    global conversation_state
-    
     try:
-        slot_number = int(re.search(r'\b(\d+)\b', user_input).group(1))
+        if slot_number is None:
+            slot_number = int(re.search(r'\b(\d+)\b', user_input).group(1))
         
-        if 1 <= slot_number <= len(conversation_state['suggested_slots']):
-            selected_slot = conversation_state['suggested_slots'][slot_number - 1]
-            conversation_state['selected_time'] = selected_slot
-            conversation_state['stage'] = 'booking_confirmation'
+        if 1 <= slot_number <= len(state['suggested_slots']):
+            selected_slot = state['suggested_slots'][slot_number - 1]
+            state['selected_time'] = selected_slot
+            state['stage'] = 'booking_confirmation'
+            # Re-reads just the chosen slot if the search snapshot has gone stale meanwhile
+            start_prefetch(state, [selected_slot])
             formatted_time = selected_slot.strftime("%A, %B %d at %I:%M %p")
             return f"Perfect! You've selected {formatted_time}. Shall I go ahead and book this appointment for you?"
         else:
-            return f"Please select a number between 1 and {len(conversation_state['suggested_slots'])}."
+            return f"Please select a number between 1 and {len(state['suggested_slots'])}."
     except Exception as e:
-        print(f"Error in handle_slot_selection: {e}")
+        logger.error("Error in handle_slot_selection: %s", e)
         return "I didn't understand which slot you'd like. Please reply with the number of your preferred time slot."
 
-def handle_confirmation(user_input):
+def handle_confirmation(user_input, state):
     """Handle booking confirmation"""
-    global conversation_state
-    
     try:
-        if conversation_state['selected_time']:
-            original_input = conversation_state.get('current_user_input', user_input)
-            result = book_appointment(original_input, conversation_state['selected_time'])
-            conversation_state['stage'] = 'booking_complete'
-            reset_conversation_state()  
+        if state['selected_time']:
+            # The key is always present, but None until a booking request has been seen
+            original_input = state.get('current_user_input') or user_input
+            result = book_appointment(
+                original_input, state['selected_time'], snapshot=booking_snapshot(state), attendees=state.get('attendees')
+            )
+            state['stage'] = 'booking_complete'
+            reset_state(state)  
             return result
         else:
             return "I don't have a time slot selected. Please choose a time slot first."
+    except GoogleAPIError as e:
+        # The selection is kept, so another "yes" retries the booking
+        return calendar_error_reply(e) + " Reply 'yes' to retry the booking."
     except Exception as e:
-        print(f"Error in handle_confirmation: {e}")
+        logger.error("Error in handle_confirmation: %s", e)
         return "I encountered an error while booking. Please try again."
 
-def app(user_input):
+def app(user_input, session_id=DEFAULT_SESSION):
     """Main application logic with conversation flow"""
-    global conversation_state
+    with turn(), session_store.session(session_id) as state:
+        return _app(user_input, state)
+
+async def app_async(user_input, session_id=DEFAULT_SESSION):
+    """Async counterpart of app() that never blocks the event loop"""
+    return await run_blocking(app, user_input, session_id)
+
+async def app_stream(user_input, session_id=DEFAULT_SESSION):
+    """Run one turn and yield its events as they happen
+
+    Yields dicts with a 'type' of 'progress' (slot search status), 'slot'
+    (a free slot as soon as it is found), 'token' (LLM output), and finally
+    'done' with the full response.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    
+    def emit(kind, data):
+        loop.call_soon_threadsafe(events.put_nowait, dict(data, type=kind))
+    
+    def run_turn():
+        with listen(emit):
+            return app(user_input, session_id)
+    
+    turn = loop.run_in_executor(_executor, run_turn)
+    # Events are queued from the worker thread before the turn finishes, so
+    # this end marker always arrives after the last of them.
+    turn.add_done_callback(lambda _: events.put_nowait(None))
     
-    print(f"🖋️ User input received: {user_input}")
-    print(f"📊 Current stage: {conversation_state['stage']}")
+    while True:
+        event = await events.get()
+        if event is None:
+            break
+        yield event
+    
+    yield {'type': 'done', 'response': await turn}
+
+async def reset_conversation_state_async(session_id=DEFAULT_SESSION):
+    """Async counterpart of reset_conversation_state()"""
+    await run_blocking(reset_conversation_state, session_id)
+
+def _app(user_input, state):
+    """Run one conversation turn against a session's state"""
+    logger.debug("🖋️ User input received: %s", user_input)
+    logger.debug("📊 Current stage: %s", state['stage'])
     
     try:
-        user_intent = detect_intent(user_input)
-        print(f"🎯 Detected intent: {user_intent}")
+        with stage('intent'):
+            classification = classify_intent(user_input)
+        user_intent = classification.intent
+        logger.debug("🎯 Detected intent: %s %s", user_intent, classification.scores)
         
         if any(phrase in user_input.lower() for phrase in ['why not', 'why can\'t', 'what about']):
-            if conversation_state.get('last_requested_time'):
+            if state.get('last_requested_time'):
                 return f"The specific time you requested might be outside business hours (9 AM - 6 PM on weekdays) or may conflict with an existing appointment. Let me check for the exact time you want - could you specify the exact time again?"
             else:
                 return "Let me help you find the exact time you're looking for. Could you please specify the exact time you'd prefer?"
         
-        if conversation_state['stage'] == 'initial':
+        if state['stage'] == 'initial':
             if user_intent == 'booking':
                 try:
                     parsed_time = parse_natural_time(user_input)
                     if parsed_time:
-                        conversation_state['last_requested_time'] = parsed_time
+                        state['last_requested_time'] = parsed_time
                 except:
                     pass  
-                return handle_booking_intent(user_input)
+                return handle_booking_intent(user_input, state)
             elif user_intent == 'availability':
-                return handle_availability_intent(user_input)
+                return handle_availability_intent(user_input, state)
+            elif user_intent == 'group_scheduling':
+                return handle_group_intent(user_input, state, classification.attendees)
             else:
-                response = llm([
-                    SystemMessage(content="""You are a helpful AI booking assistant. Your main job is to help users book appointments on their Google Calendar. 
-                    
-                    When users ask about booking, scheduling, or availability, guide them through the process. 
-                    For general questions, be helpful but try to steer the conversation toward how you can help them with scheduling.
-                    
-                    Keep responses concise and friendly."""),
-                    HumanMessage(content=user_input)
-                ]).content
+                response = general_reply(user_input)
                 
                 return response + "\n\nI can help you book appointments on your calendar. Just let me know when you'd like to schedule something!"
         
-        elif conversation_state['stage'] == 'availability_check':
-            if user_intent == 'slot_selection':
-                return handle_slot_selection(user_input)
+        elif state['stage'] == 'availability_check':
+            if classification.slot_number is not None:
+                return handle_slot_selection(user_input, state, classification.slot_number)
             elif user_intent == 'booking' or user_intent == 'confirmation':
                 if re.search(r'\b\d+\b', user_input):
-                    return handle_slot_selection(user_input)
+                    return handle_slot_selection(user_input, state)
                 else:
                     return "Which time slot would you like to book? Please reply with the number of your preferred slot."
             else:
                 return "Which time slot would you like to book? Please reply with the number (1, 2, 3, etc.) of your preferred time."
         
-        elif conversation_state['stage'] == 'booking_confirmation':
-            if user_intent == 'confirmation' or 'yes' in user_input.lower() or 'confirm' in user_input.lower():
-                return handle_confirmation(user_input)
-            elif 'no' in user_input.lower() or 'cancel' in user_input.lower():
-                reset_conversation_state()
+        elif state['stage'] == 'booking_confirmation':
+            confirm, cancel = classification.score('confirmation'), classification.score('cancellation')
+            # Ties confirm, so "yes, no problem" books rather than cancels
+            if confirm and confirm >= cancel:
+                return handle_confirmation(user_input, state)
+            elif cancel > 0:
+                reset_state(state)
                 return "No problem! Let me know if you'd like to schedule a different time."
             else:
                 return "Should I go ahead and book this appointment? Please reply with 'yes' to confirm or 'no' to cancel."
         
         else:
             # Reset state and handle as new conversation
-            reset_conversation_state()
-            return app(user_input)
+            reset_state(state)
+            return _app(user_input, state)
             
     except Exception as e:
-        print(f"Error in app function: {e}")
+        logger.error("Error in app function: %s", e)
         # Reset state on error and provide helpful message
-        reset_conversation_state()
+        reset_state(state)
         return f"I encountered an error processing your request. Let me help you start fresh - what would you like to schedule? You can try phrases like 'Book a meeting tomorrow at 3 PM' or 'Schedule a call between 2-4 PM next week'."
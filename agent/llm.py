@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from .metrics import record_cache_lookup, record_llm_call, stage
+from .progress import is_listening, report
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = """You are a helpful AI booking assistant. Your main job is to help users book appointments on their Google Calendar. 
+                    
+                    When users ask about booking, scheduling, or availability, guide them through the process. 
+                    For general questions, be helpful but try to steer the conversation toward how you can help them with scheduling.
+                    
+                    Keep responses concise and friendly."""
+
+# 'openai' always uses ChatOpenAI, 'offline' never does, and 'auto' uses it
+# only when OPENAI_API_KEY is set.
+LLM_MODE = os.getenv('AGENT_LLM_MODE', 'auto')
+
+OFFLINE_REPLY = "Hi! I'm your AI booking assistant."
+
+LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', '512'))
+LLM_CACHE_TTL_SECONDS = float(os.getenv('LLM_CACHE_TTL_SECONDS', '3600'))
+# Answer cacheable prompts at temperature 0, so a cached reply is the one the model would give anyway
+LLM_DETERMINISTIC = os.getenv('LLM_DETERMINISTIC', '').lower() in ('1', 'true', 'yes')
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+class ResponseCache:
+    """LLM replies keyed by system-prompt hash and normalized input, with TTL and LRU eviction"""
+
+    def __init__(self, max_size=LLM_CACHE_SIZE, ttl_seconds=LLM_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+    @staticmethod
+    def key(system_prompt, user_input):
+        prompt_hash = hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+        normalized = ' '.join(_PUNCTUATION_RE.sub(' ', user_input.lower()).split())
+        return prompt_hash, normalized
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, reply):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (reply, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats['evicted'] += 1
+
+    def info(self):
+        with self._lock:
+            return dict(self.stats, size=len(self._entries), maxsize=self.max_size)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+response_cache = ResponseCache()
+
+class OfflineLLM:
+    """Deterministic stand-in for the chat model, used when no OpenAI key is configured"""
+
+    def __init__(self, reply=OFFLINE_REPLY, token_delay=0.0):
+        self.reply = reply
+        self.token_delay = token_delay
+
+    def complete(self, system_prompt, user_input):
+        return self.reply
+
+    def stream(self, system_prompt, user_input):
+        for i, word in enumerate(self.reply.split(' ')):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield word if i == 0 else ' ' + word
+
+class OpenAIChatLLM:
+    """ChatOpenAI behind the same small interface as OfflineLLM"""
+
+    def __init__(self, api_key, temperature=0.7):
+        # langchain and the OpenAI client are only imported once a reply is needed
+        from langchain.chat_models import ChatOpenAI
+        self._chat = ChatOpenAI(api_key=api_key, temperature=temperature)
+
+    def _messages(self, system_prompt, user_input):
+        from langchain.schema import HumanMessage, SystemMessage
+        return [SystemMessage(content=system_prompt), HumanMessage(content=user_input)]
+
+    def complete(self, system_prompt, user_input):
+        return self._chat(self._messages(system_prompt, user_input)).content
+
+    def stream(self, system_prompt, user_input):
+        for chunk in self._chat.stream(self._messages(system_prompt, user_input)):
+            if chunk.content:
+                yield chunk.content
+
+_llm = None
+_llm_lock = threading.Lock()
+
+def _create_llm():
+    api_key = os.getenv("OPENAI_API_KEY")
+    if LLM_MODE == 'offline':
+        return OfflineLLM()
+    if not api_key:
+        if LLM_MODE == 'openai':
+            raise ValueError("Missing OPENAI_API_KEY. Please make sure it's set in your .env file.")
+        logger.info("ℹ️ OPENAI_API_KEY not set, general questions get an offline reply")
+        return OfflineLLM()
+    return OpenAIChatLLM(api_key, temperature=0 if LLM_DETERMINISTIC else 0.7)
+
+def get_llm():
+    """Return the process-wide chat model, creating it on first use"""
+    global _llm
+
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = _create_llm()
+    return _llm
+
+def set_llm(llm):
+    """Swap in another chat model, e.g. a local stand-in for tests and load runs"""
+    global _llm
+    _llm = llm
+
+def general_reply(user_input):
+    """Answer a message that is not about booking, streaming tokens to a progress listener if one is set"""
+    cache_key = response_cache.key(SYSTEM_PROMPT, user_input)
+    reply = response_cache.get(cache_key)
+    record_cache_lookup('llm', reply is not None)
+    if reply is not None:
+        report('token', content=reply)
+        return reply
+
+    llm = get_llm()
+    try:
+        with stage('llm'):
+            if not is_listening():
+                reply = llm.complete(SYSTEM_PROMPT, user_input)
+            else:
+                tokens = []
+                for token in llm.stream(SYSTEM_PROMPT, user_input):
+                    tokens.append(token)
+                    report('token', content=token)
+                reply = ''.join(tokens)
+    except Exception:
+        record_llm_call('error')
+        raise
+    record_llm_call()
+
+    response_cache.put(cache_key, reply)
+    return reply
@@ -1,315 +1,103 @@
+import logging
+import os
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-import dateparser
 import pytz
-import re
-from .calendar import check_time_slot_availability, find_available_slots, create_calendar_event, update_calendar_timezone, get_calendar_timezone, test_simple_event_creation
+from .intervals import BusyIndex, merge_timelines, to_epoch
+from .metrics import timed
+from .time_parser import parse_duration, parse_time_expression
+from .google_api import GoogleAPIError
+from .calendar import find_available_slots, test_simple_event_creation
+from .policy import get_policy
+from .providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+# Busy time read earlier in the conversation is trusted for this long; an older
+# snapshot makes the booking re-check the slot against the calendar
+SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv('SNAPSHOT_MAX_AGE_SECONDS', '60'))
+
+@dataclass
+class AvailabilitySnapshot:
+    """Busy time read during a slot search or prefetch, reused when the booking is confirmed"""
+    busy_index: BusyIndex
+    window_start: datetime
+    window_end: datetime
+    fetched_at: float
+
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+    def covers(self, start_time, duration_minutes):
+        """True if the snapshot is fresh and spans the whole slot"""
+        end_time = start_time + timedelta(minutes=duration_minutes)
+        return (
+            self.age() <= SNAPSHOT_MAX_AGE_SECONDS
+            and self.window_start <= start_time and end_time <= self.window_end
+        )
 
 def parse_natural_time(user_input):
     """Enhanced time parsing for natural language"""
     try:
-        user_input_lower = user_input.lower()
-        
-        tz = pytz.timezone('Asia/Kolkata')
-        now = datetime.now(tz)
-        
-        print(f"🔍 Parsing input: '{user_input}'")
-        print(f"🕐 Current time: {now.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-        
-        target_date = None
-        
-        if "tomorrow" in user_input_lower:
-            target_date = now + timedelta(days=1)
-            print(f"📅 Target date (tomorrow): {target_date.strftime('%Y-%m-%d')}")
-        elif "today" in user_input_lower:
-            target_date = now
-            print(f"📅 Target date (today): {target_date.strftime('%Y-%m-%d')}")
-        elif "next week" in user_input_lower:
-            days_until_monday = (7 - now.weekday()) % 7
-            if days_until_monday == 0:  
-                days_until_monday = 7
-            target_date = now + timedelta(days=days_until_monday)
-            print(f"📅 Target date (next week): {target_date.strftime('%Y-%m-%d')}")
-        else:
-            weekdays = {
-                'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-                'friday': 4, 'saturday': 5, 'sunday': 6
-            }
-            
-            for day_name, day_num in weekdays.items():
-                if day_name in user_input_lower:
-                    days_ahead = day_num - now.weekday()
-                    if days_ahead <= 0:  
-                        days_ahead += 7
-                    
-                    if "next" in user_input_lower:
-                        days_ahead += 7
-                    
-                    target_date = now + timedelta(days=days_ahead)
-                    print(f"📅 Target date ({day_name}): {target_date.strftime('%Y-%m-%d')}")
-                    break
-        
-        between_pattern = re.search(r'between (\d+)[-–](\d+)\s*(am|pm)?', user_input_lower)
-        if between_pattern:
-            start_hour = int(between_pattern.group(1))
-            end_hour = int(between_pattern.group(2))
-            period = between_pattern.group(3)
-            
-            if period == 'pm' and start_hour != 12:
-                start_hour += 12
-            elif period == 'am' and start_hour == 12:
-                start_hour = 0
-            
-            if target_date is None:
-                target_date = now + timedelta(days=1)
-                while target_date.weekday() >= 5:  
-                    target_date += timedelta(days=1)
-            
-            naive_time = target_date.replace(hour=start_hour, minute=0, second=0, microsecond=0, tzinfo=None)
-            result_time = tz.localize(naive_time)
-            print(f"🕐 Parsed time (between pattern): {result_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            return result_time
-        
-        time_range_patterns = [
-            r'(\d{1,2})\s*(?:to|-|–)\s*(\d{1,2})\s*(am|pm)',  
-            r'(\d{1,2}):(\d{2})\s*(?:to|-|–)\s*(\d{1,2}):(\d{2})\s*(am|pm)?',  
-        ]
-        
-        for pattern in time_range_patterns:
-            match = re.search(pattern, user_input_lower)
-            if match:
-                if len(match.groups()) == 3:  
-                    start_hour = int(match.group(1))
-                    end_hour = int(match.group(2))
-                    period = match.group(3)
-                    
-                    if period == 'pm' and start_hour != 12:
-                        start_hour += 12
-                    elif period == 'am' and start_hour == 12:
-                        start_hour = 0
-                    
-                    if target_date is None:
-                        target_date = now + timedelta(days=1)
-                    
-                    naive_time = target_date.replace(hour=start_hour, minute=0, second=0, microsecond=0, tzinfo=None)
-                    result_time = tz.localize(naive_time)
-                    print(f"🕐 Parsed time (range pattern): {result_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-                    return result_time
-        
-        time_patterns = [
-            r'(\d{1,2})\s*(am|pm)', 
-            r'(\d{1,2}):(\d{2})\s*(am|pm)?',  
-            r'(\d{1,2})\s*o\'?clock',  
-        ]
+        parsed = parse_time_expression(user_input)
+        if parsed:
+            logger.debug("🎯 Final parsed time (%s): %s", parsed.source, parsed.start)
+            return parsed.start
         
-        extracted_hour = None
-        extracted_minute = 0
-        is_pm = False
-        
-        for pattern in time_patterns:
-            match = re.search(pattern, user_input_lower)
-            if match:
-                if len(match.groups()) >= 2 and match.group(2) in ['am', 'pm']:
-                    extracted_hour = int(match.group(1))
-                    is_pm = match.group(2) == 'pm'
-                    print(f"⏰ Found time pattern: {extracted_hour} {match.group(2)}")
-                elif len(match.groups()) >= 3 and match.group(3):
-                    extracted_hour = int(match.group(1))
-                    extracted_minute = int(match.group(2))
-                    is_pm = match.group(3) == 'pm'
-                    print(f"⏰ Found time pattern: {extracted_hour}:{extracted_minute} {match.group(3)}")
-                elif len(match.groups()) >= 2:
-                    extracted_hour = int(match.group(1))
-                    if len(match.groups()) >= 2 and match.group(2).isdigit():
-                        extracted_minute = int(match.group(2))
-                    print(f"⏰ Found time pattern: {extracted_hour}:{extracted_minute}")
-                else:
-                    extracted_hour = int(match.group(1))
-                    print(f"⏰ Found time pattern: {extracted_hour} o'clock")
-                break
-        
-        if extracted_hour is not None:
-            original_hour = extracted_hour
-            if is_pm and extracted_hour != 12:
-                extracted_hour += 12
-            elif not is_pm and extracted_hour == 12:
-                extracted_hour = 0
-            
-            if "evening" in user_input_lower or "night" in user_input_lower:
-                if extracted_hour < 12 and not is_pm:
-                    extracted_hour += 12
-                    print(f"🌆 Evening/night context: adjusted to {extracted_hour}:00")
-            
-            print(f"🔢 Converted {original_hour}{'pm' if is_pm else 'am'} to 24-hour: {extracted_hour}:00")
-        
-        if target_date and extracted_hour is not None:
-            naive_time = target_date.replace(
-                hour=extracted_hour, 
-                minute=extracted_minute, 
-                second=0, 
-                microsecond=0,
-                tzinfo=None
-            )
-            result_time = tz.localize(naive_time)
-            print(f"🎯 Final parsed time: {result_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            return result_time
-        
-        if extracted_hour is not None:
-            naive_time = now.replace(hour=extracted_hour, minute=extracted_minute, second=0, microsecond=0, tzinfo=None)
-            target_time = tz.localize(naive_time)
-            if target_time <= now:
-                target_time += timedelta(days=1)
-            print(f"🎯 Final parsed time: {target_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            return target_time
-        
-        if target_date:
-            if "afternoon" in user_input_lower:
-                naive_time = target_date.replace(hour=14, minute=0, second=0, microsecond=0, tzinfo=None)
-            elif "morning" in user_input_lower:
-                naive_time = target_date.replace(hour=10, minute=0, second=0, microsecond=0, tzinfo=None)
-            elif "evening" in user_input_lower or "night" in user_input_lower:
-                naive_time = target_date.replace(hour=19, minute=0, second=0, microsecond=0, tzinfo=None)
-            else:
-                naive_time = target_date.replace(hour=10, minute=0, second=0, microsecond=0, tzinfo=None)
-            
-            result_time = tz.localize(naive_time)
-            print(f"🎯 Final parsed time (relative): {result_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            return result_time
-        
-        parsed_time = dateparser.parse(user_input, settings={'TIMEZONE': 'Asia/Kolkata'})
-        if parsed_time:
-            if parsed_time.tzinfo is None:
-                parsed_time = tz.localize(parsed_time)
-            print(f"🎯 Final parsed time (dateparser): {parsed_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            return parsed_time
-        
-        print("❌ Could not parse time from input")
+        logger.debug("❌ Could not parse time from input")
         return None
         
     except Exception as e:
-        print(f"Error parsing time: {e}")
+        logger.error("Error parsing time: %s", e)
         return None
 
 def parse_time_with_duration(user_input):
     """Parse time and extract duration information"""
     try:
-        user_input_lower = user_input.lower()
-        tz = pytz.timezone('Asia/Kolkata')
-        now = datetime.now(tz)
-        
-        target_date = None
-        
-        if "tomorrow" in user_input_lower:
-            target_date = now + timedelta(days=1)
-        elif "today" in user_input_lower:
-            target_date = now
-        elif "next week" in user_input_lower:
-            days_until_monday = (7 - now.weekday()) % 7
-            if days_until_monday == 0:  
-                days_until_monday = 7
-            target_date = now + timedelta(days=days_until_monday)
-        else:
-            weekdays = {
-                'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-                'friday': 4, 'saturday': 5, 'sunday': 6
-            }
-            
-            for day_name, day_num in weekdays.items():
-                if day_name in user_input_lower:
-                    days_ahead = day_num - now.weekday()
-                    if days_ahead <= 0:  
-                        days_ahead += 7
-                    
-                    if "next" in user_input_lower:
-                        days_ahead += 7
-                    
-                    target_date = now + timedelta(days=days_ahead)
-                    break
-        
-        between_pattern = re.search(r'between (\d+)[-–](\d+)\s*(am|pm)?', user_input_lower)
-        if between_pattern:
-            start_hour = int(between_pattern.group(1))
-            end_hour = int(between_pattern.group(2))
-            period = between_pattern.group(3)
-            
-            if period == 'pm' and start_hour != 12:
-                start_hour += 12
-                end_hour += 12
-            elif period == 'am' and start_hour == 12:
-                start_hour = 0
-            elif period == 'am' and end_hour == 12:
-                end_hour = 0
-            
-            if target_date is None:
-                target_date = now + timedelta(days=1)
-                while target_date.weekday() >= 5:  
-                    target_date += timedelta(days=1)
-            
-            naive_time = target_date.replace(hour=start_hour, minute=0, second=0, microsecond=0, tzinfo=None)
-            start_time = tz.localize(naive_time)
-            
-            duration_minutes = (end_hour - start_hour) * 60
-            
-            return {
-                'start_time': start_time,
-                'duration': duration_minutes,
-                'is_range': True
-            }
-        
-        time_range_patterns = [
-            r'(\d{1,2})\s*(?:to|-|–)\s*(\d{1,2})\s*(am|pm)',  # 10 to 11 am, 2-3 pm
-            r'(\d{1,2}):(\d{2})\s*(?:to|-|–)\s*(\d{1,2}):(\d{2})\s*(am|pm)?',  # 10:30 to 11:30 am
-        ]
-        
-        for pattern in time_range_patterns:
-            match = re.search(pattern, user_input_lower)
-            if match:
-                if len(match.groups()) == 3:  # Format: 10 to 11 am
-                    start_hour = int(match.group(1))
-                    end_hour = int(match.group(2))
-                    period = match.group(3)
-                    
-                    # Convert to 24-hour format
-                    if period == 'pm' and start_hour != 12:
-                        start_hour += 12
-                        end_hour += 12
-                    elif period == 'am' and start_hour == 12:
-                        start_hour = 0
-                    elif period == 'am' and end_hour == 12:
-                        end_hour = 0
-                    
-                    # Use target_date if already determined, otherwise default to tomorrow
-                    if target_date is None:
-                        target_date = now + timedelta(days=1)
-                    
-                    # Create naive datetime first, then localize
-                    naive_time = target_date.replace(hour=start_hour, minute=0, second=0, microsecond=0, tzinfo=None)
-                    start_time = tz.localize(naive_time)
-                    
-                    duration_minutes = (end_hour - start_hour) * 60
-                    
-                    return {
-                        'start_time': start_time,
-                        'duration': duration_minutes,
-                        'is_range': True
-                    }
-        
-        # If no range found, use regular parsing
-        parsed_time = parse_natural_time(user_input)
-        if parsed_time and isinstance(parsed_time, datetime):
+        parsed = parse_time_expression(user_input)
+        if parsed:
             return {
-                'start_time': parsed_time,
-                'duration': 30,  # Default 30 minutes
-                'is_range': False
+                'start_time': parsed.start,
+                'duration': parsed.duration,
+                'is_range': parsed.is_range
             }
         
         return None
         
     except Exception as e:
-        print(f"Error parsing time with duration: {e}")
+        logger.error("Error parsing time with duration: %s", e)
         return None
 
-def check_availability(user_input, start_date=None, end_date=None):
-    """Check availability and return available slots"""
+def common_busy_index(window_start, window_end, calendar_ids, unreadable=None):
+    """Busy time of all the calendars in one BusyIndex: one bulk free/busy read, then a k-way merge
+
+    Calendars that cannot be read are recorded in unreadable, when given,
+    and left out.
+    """
+    busy = get_provider().get_freebusy(window_start, window_end, calendar_ids, errors=unreadable)
+    return BusyIndex.from_merged(merge_timelines(busy.values()))
+
+def meeting_calendars(attendees):
+    """The organizer's primary calendar followed by each attendee's, without duplicates"""
+    return list(dict.fromkeys(['primary'] + list(attendees)))
+
+def read_snapshot(window_start, window_end, attendees=None, unreadable=None):
+    """Read busy time for the window once, as an AvailabilitySnapshot; with attendees, their calendars count too"""
+    fetched_at = time.monotonic()
+    if attendees:
+        busy_index = common_busy_index(window_start, window_end, meeting_calendars(attendees), unreadable)
+    else:
+        busy_index = get_provider().get_busy_index(window_start, window_end)
+    return AvailabilitySnapshot(busy_index, window_start, window_end, fetched_at)
+
+def _search_snapshot(start_date, end_date, duration_minutes=30):
+    """Read busy time once for every candidate slot find_available_slots may try between the dates"""
+    return read_snapshot(*get_policy('primary').search_window(start_date, end_date, duration_minutes))
+
+@timed('availability')
+def check_availability(user_input, start_date=None, end_date=None, limit=10):
+    """Check availability and return up to limit available slots"""
     try:
         if start_date is None:
             start_date = datetime.now(pytz.timezone('Asia/Kolkata'))
@@ -317,14 +105,21 @@ def check_availability(user_input, start_date=None, end_date=None):
         if end_date is None:
             end_date = start_date + timedelta(days=7)  # Check next 7 days
         
-        available_slots = find_available_slots(start_date, end_date)
+        available_slots = find_available_slots(start_date, end_date, busy_index=_search_snapshot(start_date, end_date).busy_index, limit=limit)
         return available_slots
+    except GoogleAPIError:
+        raise
     except Exception as e:
-        print(f"Error checking availability: {e}")
+        logger.error("Error checking availability: %s", e)
         return []
 
-def suggest_time_slots(user_input):
+def suggest_time_slots(user_input, limit=5):
     """Suggest available time slots based on user input"""
+    return search_time_slots(user_input, limit)[0]
+
+@timed('availability')
+def search_time_slots(user_input, limit=5):
+    """Up to limit suggested slots plus the AvailabilitySnapshot they were found in, which book_appointment can reuse"""
     try:
         # First try to parse with duration
         time_info = parse_time_with_duration(user_input)
@@ -333,72 +128,235 @@ def suggest_time_slots(user_input):
             start_time = time_info['start_time']
             duration = time_info.get('duration', 30)
             
+            # One busy index covers both the requested slot and every candidate on that day
+            window_start, window_end = get_policy('primary').search_window(start_time, start_time, duration)
+            snapshot = read_snapshot(
+                min(start_time, window_start),
+                max(start_time + timedelta(minutes=duration), window_end)
+            )
+            
             # Check if the specific time is available
-            if check_time_slot_availability(start_time, duration):
-                return [start_time]
+            if snapshot.busy_index.is_free(to_epoch(start_time), duration * 60):
+                return [start_time], snapshot
             else:
                 # Find nearby available slots
-                start_search = start_time.replace(hour=9, minute=0)
-                end_search = start_time.replace(hour=18, minute=0)
-                return find_available_slots(start_search, end_search)
+                return find_available_slots(start_time, start_time, duration, busy_index=snapshot.busy_index, limit=limit), snapshot
         else:
             # General availability check
             now = datetime.now(pytz.timezone('Asia/Kolkata'))
-            return find_available_slots(now, now + timedelta(days=7))
+            end_search = now + timedelta(days=7)
+            snapshot = _search_snapshot(now, end_search)
+            return find_available_slots(now, end_search, busy_index=snapshot.busy_index, limit=limit), snapshot
+    except GoogleAPIError:
+        raise
     except Exception as e:
-        print(f"Error suggesting time slots: {e}")
-        return []
+        logger.error("Error suggesting time slots: %s", e)
+        return [], None
 
-def book_appointment(user_input, selected_time, title="Meeting via AI Booking Agent"):
-    """Book an appointment at the specified time"""
+# Sources whose parse names an exact start time rather than just a day
+_EXACT_SOURCES = ('time', 'clock', 'range', 'between')
+
+@dataclass
+class CommonAvailability:
+    """Result of a multi-attendee search
+
+    slots are the earliest common free slots, or just the requested time
+    when exact is set. unreadable maps calendars that could not be read to
+    Google's reasons; they were left out of the search.
+    """
+    slots: list
+    snapshot: AvailabilitySnapshot
+    unreadable: dict
+    exact: bool = False
+
+def _common_search_window(user_input, parsed):
+    """Days to search for a common slot: the parsed day, the parsed week, or the next 7 days"""
+    now = datetime.now(pytz.timezone('Asia/Kolkata'))
+    if parsed is None or parsed.source == 'dateparser':
+        return now, now + timedelta(days=7)
+    day = parsed.start.replace(hour=0, minute=0, second=0, microsecond=0)
+    days = 7 if 'week' in user_input.lower() else 1
+    # find_available_slots takes whole dates, so end on the last day rather than at midnight after it
+    return max(now, day), day + timedelta(days=days) - timedelta(minutes=1)
+
+def find_common_slots(window_start, window_end, attendees, duration_minutes=30, limit=5, exact=None):
+    """Earliest slots between the dates when the organizer and every attendee are free
+
+    Busy time for all the calendars comes from one bulk free/busy read,
+    merged into a single timeline, so the cost does not grow with the
+    number of slots tried. An exact time that suits everyone is returned on
+    its own. Returns a CommonAvailability.
+    """
+    unreadable = {}
+    policy = get_policy('primary')
+    snapshot = read_snapshot(*policy.search_window(window_start, window_end, duration_minutes), attendees, unreadable)
+    if exact is not None and snapshot.covers(exact, duration_minutes) and snapshot.busy_index.is_free(to_epoch(exact), duration_minutes * 60):
+        return CommonAvailability([exact], snapshot, unreadable, exact=True)
+    
+    slots = find_available_slots(window_start, window_end, duration_minutes, busy_index=snapshot.busy_index, policy=policy, limit=limit)
+    return CommonAvailability(slots, snapshot, unreadable)
+
+@timed('availability')
+def search_common_slots(user_input, attendees, limit=5):
+    """Common free slots for a natural-language request, searched around the time it mentions"""
+    parsed = parse_time_expression(user_input)
+    window_start, window_end = _common_search_window(user_input, parsed)
+    exact = None
+    if parsed is not None and parsed.source in _EXACT_SOURCES and parsed.start > window_start:
+        exact = parsed.start
+    return find_common_slots(window_start, window_end, attendees, booking_duration(user_input), limit, exact)
+
+def booking_duration(user_input):
+    """Minutes a booking made from this request lasts: a stated length, else the parsed range, else 30"""
+    length = parse_duration(user_input) if user_input else None
+    if length:
+        return length
+    time_info = parse_time_with_duration(user_input) if user_input else None
+    if time_info and time_info.get('duration'):
+        return time_info['duration']
+    return 30
+
+def _ensure_calendar_timezone(provider):
+    """Make sure the calendar is on the scheduling policy's timezone before an event is inserted; free while the timezone is cached"""
+    logger.debug("🔧 Checking calendar timezone...")
+    time_zone = get_policy('primary').timezone
+    if provider.get_timezone() != time_zone:
+        logger.info("🔄 Updating calendar timezone...")
+        provider.set_timezone(time_zone)
+
+def prefetch_availability(slots, duration_minutes=30, snapshot=None, attendees=None):
+    """Make sure a fresh snapshot covers the slots and warm the calendar timezone cache ahead of a booking
+
+    Runs in the background between turns, so the confirmation turn can
+    book with a single insert. A given snapshot that already covers every
+    slot is returned instead of reading the calendar again. Only reads: the
+    timezone is changed, if at all, by book_appointment once the user agrees.
+    """
+    if snapshot is None or not all(snapshot.covers(slot, duration_minutes) for slot in slots):
+        # Calendars the search could not read are left out again rather than failing the read
+        snapshot = read_snapshot(min(slots), max(slots) + timedelta(minutes=duration_minutes), attendees, {})
+    get_provider().get_timezone()
+    return snapshot
+
+@timed('booking')
+def book_appointment(user_input, selected_time, title="Meeting via AI Booking Agent", snapshot=None, attendees=None):
+    """Book an appointment at the specified time, inviting any attendees
+
+    A fresh AvailabilitySnapshot covering the slot replaces the availability
+    check; with the calendar timezone cached, that leaves only the insert.
+    The slot is re-checked against the calendar once the snapshot is older
+    than SNAPSHOT_MAX_AGE_SECONDS; with attendees, against their calendars
+    as well, so the snapshot must come from a search that included them.
+    Attendee calendars that cannot be read are left out, as in the search.
+    Calendar API failures raise
+    GoogleAPIError, so callers can tell them apart from a taken slot.
+    """
     try:
         if not isinstance(selected_time, datetime):
             return "❌ Invalid time format."
         
-        # Ensure timezone awareness - convert to Asia/Kolkata if needed
-        kolkata_tz = pytz.timezone('Asia/Kolkata')
+        # Ensure timezone awareness - convert to the scheduling policy's timezone if needed
+        policy_tz = get_policy('primary').tzinfo
         if selected_time.tzinfo is None:
-            selected_time = kolkata_tz.localize(selected_time)
-        elif selected_time.tzinfo != kolkata_tz:
-            selected_time = selected_time.astimezone(kolkata_tz)
+            selected_time = policy_tz.localize(selected_time)
+        elif selected_time.tzinfo != policy_tz:
+            selected_time = selected_time.astimezone(policy_tz)
         
         # Parse duration from user input
-        time_info = parse_time_with_duration(user_input)
-        duration_minutes = 30  # Default duration
-        
-        if time_info and time_info.get('duration'):
-            duration_minutes = time_info['duration']
+        duration_minutes = booking_duration(user_input)
+        
+        provider = get_provider()
+        if snapshot is not None and snapshot.covers(selected_time, duration_minutes):
+            logger.debug("⚡ Using availability read %.1fs ago", snapshot.age())
+            slot_free = snapshot.busy_index.is_free(to_epoch(selected_time), duration_minutes * 60)
+        elif attendees:
+            end_time = selected_time + timedelta(minutes=duration_minutes)
+            unreadable = {}
+            recheck = read_snapshot(selected_time, end_time, attendees, unreadable)
+            if unreadable:
+                logger.info("👀 Re-checked without unreadable calendars: %s", ', '.join(unreadable))
+            slot_free = recheck.busy_index.is_free(to_epoch(selected_time), duration_minutes * 60)
+        else:
+            slot_free = provider.is_free(selected_time, duration_minutes)
         
-        if not check_time_slot_availability(selected_time, duration_minutes):
+        if not slot_free:
             return "❌ This time slot is no longer available."
         
         # Check and update calendar timezone first
-        print("🔧 Checking calendar timezone...")
-        current_tz = get_calendar_timezone()
-        if current_tz != 'Asia/Kolkata':
-            print("🔄 Updating calendar timezone...")
-            update_calendar_timezone()
+        _ensure_calendar_timezone(provider)
         
-        print(f"📅 Booking appointment for: {selected_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        logger.info("📅 Booking appointment for: %s", selected_time)
         
         # Create the event
-        event_link = create_calendar_event(title, user_input, selected_time, duration_minutes)
+        event_link = provider.insert_event(title, user_input, selected_time, duration_minutes, attendees).get('htmlLink')
         
         if event_link:
             formatted_time = selected_time.strftime("%B %d, %Y at %I:%M %p")
+            invited = f"📨 Invitations sent to {', '.join(attendees)}\n\n" if attendees else ""
             
             if duration_minutes > 30:
                 end_time = selected_time + timedelta(minutes=duration_minutes)
                 formatted_end_time = end_time.strftime("%I:%M %p")
-                return f"✅ Appointment booked successfully for {formatted_time} to {formatted_end_time} (Asia/Kolkata timezone)!\n\n🔗 Event link: {event_link}\n\n"
+                return f"✅ Appointment booked successfully for {formatted_time} to {formatted_end_time} ({policy_tz.zone} timezone)!\n\n🔗 Event link: {event_link}\n\n{invited}"
             else:
-                return f"✅ Appointment booked successfully for {formatted_time} (Asia/Kolkata timezone)!\n\n🔗 Event link: {event_link}\n\n"
+                return f"✅ Appointment booked successfully for {formatted_time} ({policy_tz.zone} timezone)!\n\n🔗 Event link: {event_link}\n\n{invited}"
         else:
             return "❌ Failed to create the appointment. Please try again."
+    except GoogleAPIError:
+        raise
     except Exception as e:
-        print(f"Error booking appointment: {e}")
+        logger.error("Error booking appointment: %s", e)
         return "❌ Failed to create the appointment. Please try again."
 
+@timed('booking')
+def book_appointments_batch(entries):
+    """Book many appointments against one availability snapshot
+
+    Each entry is a dict with 'start_time' and optional 'title', 'duration'
+    and 'description'. Returns one result dict per entry, in order, with a
+    'status' of 'booked', 'conflict' or 'error'.
+    """
+    policy_tz = get_policy('primary').tzinfo
+    results = []
+    bookings = []
+    for i, entry in enumerate(entries):
+        start_time = entry['start_time']
+        if start_time.tzinfo is None:
+            start_time = policy_tz.localize(start_time)
+        else:
+            start_time = start_time.astimezone(policy_tz)
+        duration = entry.get('duration') or 30
+        results.append({'index': i, 'status': 'conflict', 'start_time': start_time, 'event_link': None, 'error': None})
+        bookings.append((entry.get('title') or "Meeting via AI Booking Agent", entry.get('description') or "", start_time, duration))
+    
+    if not bookings:
+        return results
+    
+    window_start = min(start for _, _, start, _ in bookings)
+    window_end = max(start + timedelta(minutes=duration) for _, _, start, duration in bookings)
+    provider = get_provider()
+    busy_index = provider.get_busy_index(window_start, window_end)
+    
+    # Entries accepted earlier in the batch count as busy for the later ones
+    accepted = []
+    for i, (title, description, start_time, duration) in enumerate(bookings):
+        start_ts = to_epoch(start_time)
+        if busy_index.is_free(start_ts, duration * 60):
+            busy_index.add(start_ts, start_ts + duration * 60)
+            accepted.append(i)
+    
+    if accepted:
+        created = provider.insert_events([bookings[i] for i in accepted])
+        for i, event in zip(accepted, created):
+            if isinstance(event, dict):
+                results[i]['status'] = 'booked'
+                results[i]['event_link'] = event.get('htmlLink')
+            else:
+                results[i]['status'] = 'error'
+                results[i]['error'] = str(event)
+    
+    return results
+
 def format_time_slots(slots):
     """Format time slots for display"""
     try:
@@ -412,7 +370,7 @@ def format_time_slots(slots):
         
         return "\n".join(formatted_slots)
     except Exception as e:
-        print(f"Error formatting time slots: {e}")
+        logger.error("Error formatting time slots: %s", e)
         return "Error formatting available times."
 
 def debug_time_parsing(user_input):
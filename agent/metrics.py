@@ -0,0 +1,85 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from functools import wraps
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+_LATENCY_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+
+# Stages nest: 'availability' and 'booking' include the parsing and Google
+# calls they make, so per-stage sums can exceed the turn time.
+STAGE_SECONDS = Histogram(
+    'agent_stage_seconds', "Time spent in each stage of a chat turn", ['stage'], buckets=_LATENCY_BUCKETS
+)
+TURN_SECONDS = Histogram('agent_turn_seconds', "Wall time of a whole chat turn", buckets=_LATENCY_BUCKETS)
+GOOGLE_API_CALLS = Counter(
+    'agent_google_api_calls_total', "Google Calendar API requests", ['endpoint', 'outcome']
+)
+GOOGLE_API_THROTTLED = Counter(
+    'agent_google_api_throttled_total', "Google API requests refused by the client-side quota", ['scope']
+)
+LLM_CALLS = Counter('agent_llm_calls_total', "Chat model requests", ['outcome'])
+CACHE_LOOKUPS = Counter('agent_cache_lookups_total', "Cache lookups", ['cache', 'result'])
+CALLS_PER_TURN = Histogram(
+    'agent_external_calls_per_turn', "External requests made by one chat turn", ['service'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34)
+)
+
+# Per-turn call counts; None outside a turn, e.g. for /book/batch
+_turn_calls = contextvars.ContextVar('agent_turn_calls', default=None)
+
+@contextmanager
+def stage(name):
+    """Time a block into the stage histogram"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - started)
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def turn():
+    """Time one chat turn and record how many Google and LLM requests it made"""
+    calls = {'google': 0, 'llm': 0}
+    token = _turn_calls.set(calls)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        TURN_SECONDS.observe(time.perf_counter() - started)
+        _turn_calls.reset(token)
+        for service, count in calls.items():
+            CALLS_PER_TURN.labels(service).observe(count)
+
+def _count_turn_call(service):
+    calls = _turn_calls.get()
+    if calls is not None:
+        calls[service] += 1
+
+def record_google_call(endpoint, outcome='ok'):
+    GOOGLE_API_CALLS.labels(endpoint, outcome).inc()
+    _count_turn_call('google')
+
+def record_throttled(scope):
+    GOOGLE_API_THROTTLED.labels(scope).inc()
+
+def record_llm_call(outcome='ok'):
+    LLM_CALLS.labels(outcome).inc()
+    _count_turn_call('llm')
+
+def record_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+def render():
+    """Current metrics in the Prometheus text format, with their content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
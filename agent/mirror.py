@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from .google_api import GoneError, execute
+from .intervals import event_bounds
+
+logger = logging.getLogger(__name__)
+
+MIRROR_PATH = os.getenv('CALENDAR_MIRROR_PATH', 'calendar_mirror.db')
+# Seconds a mirrored calendar may go without an incremental sync before reads refresh it
+MIRROR_MAX_STALENESS = float(os.getenv('CALENDAR_MIRROR_MAX_STALENESS', '30'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar_id, start_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at REAL NOT NULL
+);
+"""
+
+class CalendarMirror:
+    """Local SQLite copy of calendars, kept current with syncToken deltas"""
+
+    def __init__(self, path=MIRROR_PATH, max_staleness=MIRROR_MAX_STALENESS):
+        self.max_staleness = max_staleness
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+
+    def _sync_state(self, calendar_id):
+        return self._conn.execute(
+            "SELECT sync_token, synced_at FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+        ).fetchone()
+
+    def _apply(self, calendar_id, event):
+        if event.get('status') == 'cancelled':
+            self._conn.execute(
+                "DELETE FROM events WHERE calendar_id = ? AND event_id = ?", (calendar_id, event['id'])
+            )
+            return
+
+        start_ts, end_ts = event_bounds(event)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO events (calendar_id, event_id, start_ts, end_ts, body) VALUES (?, ?, ?, ?, ?)",
+            (calendar_id, event['id'], start_ts, end_ts, json.dumps(event))
+        )
+
+    def _pull(self, service, calendar_id, sync_token):
+        """Page through events.list, applying every item, and return the next sync token"""
+        page_token = None
+        while True:
+            params = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': 2500, 'pageToken': page_token}
+            if sync_token:
+                params['syncToken'] = sync_token
+            result = execute(service.events().list(**params), 'events.list')
+
+            for event in result.get('items', []):
+                self._apply(calendar_id, event)
+
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return result.get('nextSyncToken')
+
+    def sync(self, service, calendar_id='primary'):
+        """Bring one calendar up to date: a full listing first, syncToken deltas afterwards"""
+        with self._lock:
+            state = self._sync_state(calendar_id)
+            sync_token = state[0] if state else None
+
+            try:
+                with self._conn:
+                    next_token = self._pull(service, calendar_id, sync_token)
+            except GoneError:
+                if not sync_token:
+                    raise
+                # The sync token expired; start over with a full listing
+                logger.info("🔄 Sync token expired for %s, running full sync", calendar_id)
+                with self._conn:
+                    self._conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+                    next_token = self._pull(service, calendar_id, None)
+
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (calendar_id, sync_token, synced_at) VALUES (?, ?, ?)",
+                    (calendar_id, next_token, time.time())
+                )
+
+    def ensure_fresh(self, service, calendar_id='primary'):
+        """Sync a calendar if it has never been synced or is older than max_staleness"""
+        with self._lock:
+            state = self._sync_state(calendar_id)
+            if state is None or time.time() - state[1] > self.max_staleness:
+                self.sync(service, calendar_id)
+
+    def busy_intervals(self, calendar_id, start_time, end_time):
+        """Return (start_ts, end_ts) epoch pairs of mirrored events overlapping the range"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT start_ts, end_ts FROM events WHERE calendar_id = ? AND start_ts < ? AND end_ts > ? ORDER BY start_ts",
+                (calendar_id, int(end_time.timestamp()), int(start_time.timestamp()))
+            ).fetchall()
+
+    def upsert_event(self, calendar_id, event):
+        """Write a freshly created event through to the mirror"""
+        with self._lock, self._conn:
+            self._apply(calendar_id, event)
+
+    def upsert_events(self, calendar_id, events):
+        """Write many events in one transaction; returns how many were written"""
+        count = 0
+        with self._lock, self._conn:
+            for event in events:
+                self._apply(calendar_id, event)
+                count += 1
+        return count
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+def get_mirror():
+    """Return the process-wide calendar mirror, opening it on first use"""
+    global _mirror
+
+    if _mirror is None:
+        with _mirror_lock:
+            if _mirror is None:
+                _mirror = CalendarMirror()
+    return _mirror
+
+def active_mirror():
+    """Return the mirror if one has been opened, without creating it"""
+    return _mirror
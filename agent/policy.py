@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta
+import pytz
+from .metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+WORKING_START_HOUR = 9
+WORKING_END_HOUR = 18
+SLOT_STEP_MINUTES = 30
+# JSON object mapping a tenant account or calendar id to SchedulingPolicy
+# fields; its "default" entry applies to everything not listed. Other
+# entries only override the default's fields.
+SCHEDULING_POLICY_FILE = os.getenv('SCHEDULING_POLICY_FILE')
+# Candidate grids kept, one per policy and week
+SLOT_GRID_CACHE_SIZE = int(os.getenv('SLOT_GRID_CACHE_SIZE', '256'))
+
+@dataclass(frozen=True)
+class SchedulingPolicy:
+    """When meetings may start: working hours on workdays in a timezone, on a step grid
+
+    Slots start in [start_hour, end_hour) on workdays that are not holidays.
+    buffer_minutes of free time must surround a suggested slot on both sides.
+    """
+    timezone: str = 'Asia/Kolkata'
+    start_hour: int = WORKING_START_HOUR
+    end_hour: int = WORKING_END_HOUR
+    step_minutes: int = SLOT_STEP_MINUTES
+    buffer_minutes: int = 0
+    workdays: tuple = (0, 1, 2, 3, 4)
+    holidays: frozenset = field(default_factory=frozenset)
+
+    @classmethod
+    def from_dict(cls, settings, base=None):
+        """Build from JSON-style settings, holidays as ISO dates, on top of base's fields"""
+        settings = dict(settings)
+        if 'workdays' in settings:
+            settings['workdays'] = tuple(sorted(settings['workdays']))
+        if 'holidays' in settings:
+            settings['holidays'] = frozenset(date.fromisoformat(day) for day in settings['holidays'])
+        return replace(base or cls(), **settings)
+
+    @property
+    def tzinfo(self):
+        return pytz.timezone(self.timezone)
+
+    def is_workday(self, day):
+        return day.weekday() in self.workdays and day not in self.holidays
+
+    def day_start(self, day):
+        """Aware midnight at the start of day in the policy timezone"""
+        return self.at(day, 0)
+
+    def at(self, day, hour):
+        """Aware wall-clock hour:00 on day in the policy timezone, right on DST-change days; 24 is the next midnight"""
+        tz = self.tzinfo
+        return tz.normalize(tz.localize(datetime.combine(day + timedelta(days=hour // 24), time(hour % 24))))
+
+    def search_window(self, start_date, end_date, duration_minutes=30):
+        """Range of busy time a slot search between the dates looks at, buffers included"""
+        tz = self.tzinfo
+        window_start = self.at(start_date.astimezone(tz).date(), self.start_hour) - timedelta(minutes=self.buffer_minutes)
+        window_end = self.at(end_date.astimezone(tz).date(), self.end_hour) + timedelta(
+            minutes=duration_minutes + self.buffer_minutes
+        )
+        return window_start, max(window_start, window_end)
+
+DEFAULT_POLICY = SchedulingPolicy()
+
+_policies = None
+_policies_lock = threading.Lock()
+
+def _load_policies():
+    """Named policies from SCHEDULING_POLICY_FILE, with the default under None"""
+    policies = {None: DEFAULT_POLICY}
+    if not SCHEDULING_POLICY_FILE:
+        return policies
+    with open(SCHEDULING_POLICY_FILE) as f:
+        settings = json.load(f)
+    default = SchedulingPolicy.from_dict(settings.pop('default', {}))
+    policies[None] = default
+    for name, overrides in settings.items():
+        policies[name] = SchedulingPolicy.from_dict(overrides, default)
+    logger.info("🗓️ Loaded %d scheduling policies from %s", len(policies), SCHEDULING_POLICY_FILE)
+    return policies
+
+def _registry():
+    global _policies
+
+    if _policies is None:
+        with _policies_lock:
+            if _policies is None:
+                _policies = _load_policies()
+    return _policies
+
+def get_policy(name=None):
+    """The policy of a tenant account or calendar id, falling back to the default policy"""
+    policies = _registry()
+    return policies.get(name) or policies[None]
+
+def set_policy(name, policy):
+    """Register a policy for a tenant account or calendar id; None replaces the default"""
+    policies = _registry()
+    with _policies_lock:
+        policies[name] = policy
+
+_grid_cache = OrderedDict()
+_grid_cache_lock = threading.Lock()
+
+def _build_week_grid(policy, monday):
+    step = policy.step_minutes * 60
+    starts = []
+    for offset in range(7):
+        day = monday + timedelta(days=offset)
+        if not policy.is_workday(day):
+            continue
+        opens = int(policy.at(day, policy.start_hour).timestamp())
+        closes = int(policy.at(day, policy.end_hour).timestamp())
+        starts.extend(range(opens, closes, step))
+    return tuple(starts)
+
+def week_grid(policy, monday):
+    """Sorted epoch-second slot starts for the week beginning on monday, built once per policy and week"""
+    key = (policy, monday)
+    with _grid_cache_lock:
+        grid = _grid_cache.get(key)
+        if grid is not None:
+            _grid_cache.move_to_end(key)
+    record_cache_lookup('slot_grid', grid is not None)
+    if grid is not None:
+        return grid
+
+    grid = _build_week_grid(policy, monday)
+    with _grid_cache_lock:
+        _grid_cache[key] = grid
+        while len(_grid_cache) > SLOT_GRID_CACHE_SIZE:
+            _grid_cache.popitem(last=False)
+    return grid
+
+def candidate_starts(policy, start_date, end_date, after):
+    """Epoch slot starts on the policy grid from start_date's day through end_date's day, later than after"""
+    tz = policy.tzinfo
+    first_day = start_date.astimezone(tz).date()
+    last_day = end_date.astimezone(tz).date()
+    low = max(int(policy.day_start(first_day).timestamp()), int(after) + 1)
+    high = int(policy.day_start(last_day + timedelta(days=1)).timestamp())
+
+    starts = []
+    monday = first_day - timedelta(days=first_day.weekday())
+    while monday <= last_day:
+        grid = week_grid(policy, monday)
+        starts.extend(grid[bisect_left(grid, low):bisect_left(grid, high)])
+        monday += timedelta(days=7)
+    return starts
@@ -0,0 +1,24 @@
+import contextvars
+from contextlib import contextmanager
+
+# Set while a streaming turn runs; calendar and LLM code report partial
+# progress through it. Unset (the normal case) makes report() a no-op.
+_listener = contextvars.ContextVar('agent_progress_listener', default=None)
+
+@contextmanager
+def listen(callback):
+    """Send progress events of the current thread's turn to callback(kind, data)"""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+def is_listening():
+    return _listener.get() is not None
+
+def report(kind, **data):
+    """Report a progress event to the active listener, if any"""
+    callback = _listener.get()
+    if callback is not None:
+        callback(kind, data)
@@ -0,0 +1,210 @@
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+import pytz
+from . import calendar as google_calendar
+from .intervals import BusyIndex, merge_intervals, to_epoch
+from .mirror import CalendarMirror
+
+# 'google' talks to Google Calendar; 'local' keeps calendars in a SQLite file,
+# for internal resources (rooms, on-call rotas) and for offline runs.
+CALENDAR_PROVIDER = os.getenv('CALENDAR_PROVIDER', 'google')
+LOCAL_CALENDAR_PATH = os.getenv('LOCAL_CALENDAR_PATH', 'local_calendar.db')
+# Optional ICS file imported into the local calendar when it is opened
+LOCAL_CALENDAR_ICS = os.getenv('LOCAL_CALENDAR_ICS')
+LOCAL_CALENDAR_TIMEZONE = os.getenv('LOCAL_CALENDAR_TIMEZONE', 'Asia/Kolkata')
+
+class CalendarProvider:
+    """What the booking logic needs from a calendar: busy time, inserts and the calendar timezone"""
+
+    def get_busy_index(self, start_time, end_time, calendar_ids=None):
+        """Busy time of the given calendars over the range, merged into one BusyIndex"""
+        raise NotImplementedError
+
+    def get_freebusy(self, start_time, end_time, calendar_ids=None, errors=None):
+        """Merged (start_ts, end_ts) busy intervals per calendar, for many calendars at once
+
+        Calendars that cannot be read are recorded in errors, when given,
+        instead of failing the whole call.
+        """
+        raise NotImplementedError
+
+    def insert_event(self, title, description, start_time, duration_minutes=30, attendees=None):
+        """Create an event on the primary calendar, inviting the attendees, and return it; errors propagate"""
+        raise NotImplementedError
+
+    def insert_events(self, entries):
+        """Insert (title, description, start_time, duration_minutes) entries; one event or exception per entry"""
+        results = []
+        for entry in entries:
+            try:
+                results.append(self.insert_event(*entry))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def get_timezone(self):
+        raise NotImplementedError
+
+    def set_timezone(self, time_zone):
+        raise NotImplementedError
+
+    def is_free(self, start_time, duration_minutes=30, calendar_ids=None):
+        """True if [start_time, start_time + duration) overlaps no busy time"""
+        end_time = start_time + timedelta(minutes=duration_minutes)
+        busy_index = self.get_busy_index(start_time, end_time, calendar_ids)
+        return busy_index.is_free(to_epoch(start_time), duration_minutes * 60)
+
+class GoogleCalendarProvider(CalendarProvider):
+    """Google Calendar through the pooled API client; AVAILABILITY_BACKEND still picks how busy time is read"""
+
+    def get_busy_index(self, start_time, end_time, calendar_ids=None):
+        return google_calendar.get_busy_index(start_time, end_time, calendar_ids)
+
+    def get_freebusy(self, start_time, end_time, calendar_ids=None, errors=None):
+        # freebusy.query reads up to 50 calendars per request, including other people's
+        return google_calendar.get_freebusy(start_time, end_time, calendar_ids, errors)
+
+    def insert_event(self, title, description, start_time, duration_minutes=30, attendees=None):
+        return google_calendar.insert_calendar_event(title, description, start_time, duration_minutes, attendees)
+
+    def insert_events(self, entries):
+        return google_calendar.create_calendar_events_batch(entries)
+
+    def get_timezone(self):
+        return google_calendar.get_calendar_timezone()
+
+    def set_timezone(self, time_zone):
+        return google_calendar.update_calendar_timezone(time_zone)
+
+class LocalCalendarProvider(CalendarProvider):
+    """Calendars kept in a local SQLite file, queried through the (calendar_id, start_ts) index
+
+    Uses the same events table as the Google mirror, so stored events are
+    plain Calendar API event bodies.
+    """
+
+    def __init__(self, path=LOCAL_CALENDAR_PATH, time_zone=LOCAL_CALENDAR_TIMEZONE):
+        self._store = CalendarMirror(path, max_staleness=float('inf'))
+        self.time_zone = time_zone
+
+    def get_busy_index(self, start_time, end_time, calendar_ids=None):
+        intervals = []
+        for calendar_id in calendar_ids or ['primary']:
+            intervals.extend(self._store.busy_intervals(calendar_id, start_time, end_time))
+        return BusyIndex(intervals)
+
+    def get_freebusy(self, start_time, end_time, calendar_ids=None, errors=None):
+        return {
+            calendar_id: merge_intervals(self._store.busy_intervals(calendar_id, start_time, end_time))
+            for calendar_id in calendar_ids or ['primary']
+        }
+
+    def add_event(self, event, calendar_id='primary'):
+        """Store an event body as is; it needs an 'id' and start/end fields"""
+        self._store.upsert_event(calendar_id, event)
+        return event
+
+    def insert_event(self, title, description, start_time, duration_minutes=30, attendees=None, calendar_id='primary'):
+        event = google_calendar.event_body(title, description, start_time, duration_minutes, attendees)
+        event['id'] = uuid.uuid4().hex
+        event['htmlLink'] = f"local://{calendar_id}/{event['id']}"
+        event['status'] = 'confirmed'
+        return self.add_event(event, calendar_id)
+
+    def get_timezone(self):
+        return self.time_zone
+
+    def set_timezone(self, time_zone):
+        self.time_zone = time_zone
+        return time_zone
+
+    def import_ics(self, path, calendar_id='primary'):
+        """Load the VEVENTs of an ICS file; returns how many were stored
+
+        Recurrence rules are not expanded, so only each series' first
+        occurrence is stored.
+        """
+        return self._store.upsert_events(calendar_id, read_ics_events(path))
+
+def _ics_time(value, params):
+    """ICS DTSTART/DTEND value to a Calendar API start/end field"""
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return {'date': f"{value[:4]}-{value[4:6]}-{value[6:8]}"}
+    moment = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        moment = pytz.utc.localize(moment)
+    elif 'TZID' in params:
+        moment = pytz.timezone(params['TZID']).localize(moment)
+    return {'dateTime': moment.isoformat()}
+
+def _unfolded_lines(path):
+    """ICS content lines with RFC 5545 line folding undone"""
+    with open(path, encoding='utf-8') as f:
+        pending = None
+        for raw in f:
+            line = raw.rstrip('\r\n')
+            if line[:1] in (' ', '\t') and pending is not None:
+                pending += line[1:]
+                continue
+            if pending is not None:
+                yield pending
+            pending = line
+        if pending is not None:
+            yield pending
+
+def read_ics_events(path):
+    """Yield the VEVENTs of an ICS file as Calendar API event bodies, streaming the file"""
+    event = None
+    for line in _unfolded_lines(path):
+        if line == 'BEGIN:VEVENT':
+            event = {}
+        elif line == 'END:VEVENT' and event is not None:
+            if 'start' in event:
+                event.setdefault('id', uuid.uuid4().hex)
+                event.setdefault('end', event['start'])
+                yield event
+            event = None
+        elif event is not None and ':' in line:
+            name_and_params, value = line.split(':', 1)
+            name, *params = name_and_params.split(';')
+            params = dict(param.split('=', 1) for param in params if '=' in param)
+            if name == 'DTSTART':
+                event['start'] = _ics_time(value, params)
+            elif name == 'DTEND':
+                event['end'] = _ics_time(value, params)
+            elif name == 'UID':
+                event['id'] = value
+            elif name == 'SUMMARY':
+                event['summary'] = value
+            elif name == 'STATUS' and value == 'CANCELLED':
+                event['status'] = 'cancelled'
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def _create_provider():
+    if CALENDAR_PROVIDER == 'google':
+        return GoogleCalendarProvider()
+    if CALENDAR_PROVIDER == 'local':
+        provider = LocalCalendarProvider()
+        if LOCAL_CALENDAR_ICS:
+            provider.import_ics(LOCAL_CALENDAR_ICS)
+        return provider
+    raise ValueError(f"Unknown calendar provider: {CALENDAR_PROVIDER}")
+
+def get_provider():
+    """Return the process-wide calendar provider, creating it on first use"""
+    global _provider
+
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = _create_provider()
+    return _provider
+
+def set_provider(provider):
+    """Swap in another calendar provider, e.g. a LocalCalendarProvider for offline runs"""
+    global _provider
+    _provider = provider
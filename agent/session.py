@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+DEFAULT_SESSION = 'default'
+SESSION_TTL_SECONDS = float(os.getenv('SESSION_TTL_SECONDS', '1800'))
+MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', '10000'))
+
+def new_conversation_state():
+    """Fresh conversation state for a session"""
+    return {
+        'stage': 'initial',
+        'suggested_slots': [],
+        'selected_time': None,
+        'user_intent': None,
+        'last_requested_time': None,
+        'current_user_input': None
+    }
+
+def reset_state(state):
+    """Reset a session's state in place"""
+    state.clear()
+    state.update(new_conversation_state())
+
+class _Session:
+    __slots__ = ('state', 'lock', 'last_used')
+
+    def __init__(self):
+        self.state = new_conversation_state()
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+class SessionStore:
+    """Conversation state per session id, with per-session locks and TTL/LRU eviction"""
+
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS, max_sessions=MAX_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        # Sessions are kept in least-recently-used order, so idle ones sit at the front
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - entry.last_used <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+
+    def _entry(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = self._sessions[session_id] = _Session()
+            else:
+                self._sessions.move_to_end(session_id)
+            entry.last_used = now
+            return entry
+
+    @contextmanager
+    def session(self, session_id=DEFAULT_SESSION):
+        """Hold a session's lock for one turn and yield its state"""
+        entry = self._entry(session_id or DEFAULT_SESSION)
+        with entry.lock:
+            try:
+                yield entry.state
+            finally:
+                entry.last_used = time.monotonic()
+
+    def reset(self, session_id=DEFAULT_SESSION):
+        """Clear one session's state, leaving every other session alone"""
+        with self.session(session_id) as state:
+            reset_state(state)
+
+    def __len__(self):
+        return len(self._sessions)
+
+session_store = SessionStore()
@@ -0,0 +1,267 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+import pytz
+from .metrics import record_cache_lookup, stage
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# One alternation, scanned once with finditer. At any position the earlier
+# alternatives win, so "10:30 am" is read as a clock time rather than "30 am".
+# The leading lookahead skips positions no token can start at.
+_TOKEN_RE = re.compile(
+    r"(?=[\dbtnmwfsae])(?:"
+    r"(?P<between>between (?P<b_start>\d+)[-–](?P<b_end>\d+)\s*(?P<b_period>am|pm)?)"
+    r"|(?P<clock_range>(?P<cr_start_h>\d{1,2}):(?P<cr_start_m>\d{2})\s*(?:to|-|–)\s*(?P<cr_end_h>\d{1,2}):(?P<cr_end_m>\d{2})\s*(?P<cr_period>am|pm)?)"
+    r"|(?P<range>(?P<r_start>\d{1,2})\s*(?:to|-|–)\s*(?P<r_end>\d{1,2})\s*(?P<r_period>am|pm))"
+    r"|(?P<clock>(?P<c_hour>\d{1,2}):(?P<c_minute>\d{2})\s*(?P<c_period>am|pm)?)"
+    r"|(?P<ampm>(?P<a_hour>\d{1,2})\s*(?P<a_period>am|pm))"
+    r"|(?P<oclock>(?P<o_hour>\d{1,2})\s*o'?clock)"
+    r"|(?P<word>tomorrow|today|next week|next|" + '|'.join(WEEKDAYS) + r"|morning|afternoon|evening|night)"
+    r")"
+)
+
+# A stated meeting length such as "45 minutes", "1.5 hours" or "an hour"
+_LENGTH_RE = re.compile(r"\b(\d+(?:\.\d+)?|an?)\s*(?:(hours?|hrs?)|minutes?|mins?)\b")
+
+_TIME_KINDS = ('ampm', 'clock', 'oclock')
+_TZ = pytz.timezone('Asia/Kolkata')
+_DEFAULT_DURATION = 30
+
+PARSE_CACHE_SIZE = int(os.getenv('PARSE_CACHE_SIZE', '2048'))
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+_parse_cache_stats = {'hits': 0, 'misses': 0}
+
+@dataclass
+class ParsedTime:
+    """Structured result of parsing a time expression"""
+    start: datetime
+    duration: int = _DEFAULT_DURATION
+    is_range: bool = False
+    confidence: float = 0.0
+    source: str = ''
+
+    @property
+    def date(self):
+        return self.start.date()
+
+    @property
+    def end(self):
+        return self.start + timedelta(minutes=self.duration)
+
+def _scan(text):
+    """Tokenize the lower-cased input in a single pass"""
+    words = set()
+    found = {}
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'word':
+            word = match.group('word')
+            words.add(word)
+            if word == 'next week':
+                words.add('next')
+        elif kind not in found:
+            found[kind] = match
+    return words, found
+
+def _target_date(words, now):
+    if 'tomorrow' in words:
+        return now + timedelta(days=1)
+    if 'today' in words:
+        return now
+    if 'next week' in words:
+        days_until_monday = (7 - now.weekday()) % 7
+        if days_until_monday == 0:
+            days_until_monday = 7
+        return now + timedelta(days=days_until_monday)
+
+    for day_num, day_name in enumerate(WEEKDAYS):
+        if day_name in words:
+            days_ahead = day_num - now.weekday()
+            if days_ahead <= 0:
+                days_ahead += 7
+            if 'next' in words:
+                days_ahead += 7
+            return now + timedelta(days=days_ahead)
+    return None
+
+def _range_hours(start_hour, end_hour, period):
+    """Convert a range's hours to 24-hour form; the period applies to both ends"""
+    if period == 'pm' and start_hour != 12:
+        start_hour += 12
+        end_hour += 12
+    elif period == 'am' and start_hour == 12:
+        start_hour = 0
+    elif period == 'am' and end_hour == 12:
+        end_hour = 0
+    return start_hour, end_hour
+
+def _at(tz, day, hour, minute=0):
+    return tz.localize(day.replace(hour=hour, minute=minute, second=0, microsecond=0, tzinfo=None))
+
+def _parse_range(words, found, now, tz):
+    if 'between' in found:
+        match = found['between']
+        start_hour, end_hour = _range_hours(int(match.group('b_start')), int(match.group('b_end')), match.group('b_period'))
+        target_date = _target_date(words, now)
+        if target_date is None:
+            target_date = now + timedelta(days=1)
+            while target_date.weekday() >= 5:
+                target_date += timedelta(days=1)
+        return ParsedTime(_at(tz, target_date, start_hour), (end_hour - start_hour) * 60, True, 0.95, 'between')
+
+    if 'clock_range' in found:
+        match = found['clock_range']
+        period = match.group('cr_period')
+        start_hour, end_hour = _range_hours(int(match.group('cr_start_h')), int(match.group('cr_end_h')), period)
+        start_minute, end_minute = int(match.group('cr_start_m')), int(match.group('cr_end_m'))
+        target_date = _target_date(words, now) or now + timedelta(days=1)
+        duration = (end_hour - start_hour) * 60 + end_minute - start_minute
+        return ParsedTime(_at(tz, target_date, start_hour, start_minute), duration, True, 0.95, 'range')
+
+    if 'range' in found:
+        match = found['range']
+        start_hour, end_hour = _range_hours(int(match.group('r_start')), int(match.group('r_end')), match.group('r_period'))
+        target_date = _target_date(words, now) or now + timedelta(days=1)
+        return ParsedTime(_at(tz, target_date, start_hour), (end_hour - start_hour) * 60, True, 0.95, 'range')
+
+    return None
+
+def _clock_time(words, found):
+    """Return (hour, minute) in 24-hour form from the highest-priority time token"""
+    kind = next((kind for kind in _TIME_KINDS if kind in found), None)
+    if kind is None:
+        return None
+
+    match = found[kind]
+    minute = 0
+    if kind == 'ampm':
+        hour, period = int(match.group('a_hour')), match.group('a_period')
+    elif kind == 'clock':
+        hour, minute, period = int(match.group('c_hour')), int(match.group('c_minute')), match.group('c_period')
+    else:
+        hour, period = int(match.group('o_hour')), None
+
+    is_pm = period == 'pm'
+    if is_pm and hour != 12:
+        hour += 12
+    elif not is_pm and hour == 12:
+        hour = 0
+
+    if ('evening' in words or 'night' in words) and hour < 12 and not is_pm:
+        hour += 12
+    return hour, minute
+
+def _parse(text, now):
+    tz = _TZ
+
+    try:
+        words, found = _scan(text)
+
+        parsed = _parse_range(words, found, now, tz)
+        if parsed:
+            return parsed
+
+        target_date = _target_date(words, now)
+        clock = _clock_time(words, found)
+
+        if clock and target_date:
+            return ParsedTime(_at(tz, target_date, *clock), confidence=0.9, source='time')
+
+        if clock:
+            # Today at that time; parse_time_expression rolls it to tomorrow once it has passed
+            return ParsedTime(_at(tz, now, *clock), confidence=0.8, source='clock')
+
+        if target_date:
+            if 'afternoon' in words:
+                return ParsedTime(_at(tz, target_date, 14), confidence=0.6, source='relative')
+            if 'morning' in words:
+                return ParsedTime(_at(tz, target_date, 10), confidence=0.6, source='relative')
+            if 'evening' in words or 'night' in words:
+                return ParsedTime(_at(tz, target_date, 19), confidence=0.6, source='relative')
+            return ParsedTime(_at(tz, target_date, 10), confidence=0.5, source='relative')
+    except ValueError as e:
+        # Out-of-range hours such as "13 pm" end up here
+        logger.warning("Error parsing time: %s", e)
+        return None
+
+    # dateparser loads its language data on import, so it is only pulled in for the fallback
+    import dateparser
+    # Relative phrases ("in 3 days") resolve against now, not the wall clock
+    relative_base = (now.astimezone(tz) if now.tzinfo else now).replace(tzinfo=None)
+    parsed_time = dateparser.parse(text, settings={'TIMEZONE': 'Asia/Kolkata', 'RELATIVE_BASE': relative_base})
+    if parsed_time:
+        if parsed_time.tzinfo is None:
+            parsed_time = tz.localize(parsed_time)
+        return ParsedTime(parsed_time, confidence=0.4, source='dateparser')
+
+    return None
+
+def normalize_utterance(user_input):
+    """Lower-case and collapse whitespace so trivially different inputs share a cache entry"""
+    return ' '.join(user_input.lower().split())
+
+def parse_time_expression(user_input, now=None):
+    """Parse a natural-language time expression into a ParsedTime, or None
+
+    Results are memoized per normalized input and reference hour, so relative
+    phrases such as "tomorrow" resolve against the right day. dateparser
+    results can depend on the exact time ("in 20 minutes"), so they are
+    memoized per reference minute instead.
+    """
+    now = now or datetime.now(_TZ)
+    text = normalize_utterance(user_input)
+    key = (text, now.date(), now.hour)
+    minute_key = key + (now.minute,)
+
+    with _parse_cache_lock:
+        cached = False
+        for lookup in (key, minute_key):
+            if lookup in _parse_cache:
+                _parse_cache.move_to_end(lookup)
+                parsed = _parse_cache[lookup]
+                cached = True
+                break
+        _parse_cache_stats['hits' if cached else 'misses'] += 1
+
+    record_cache_lookup('parse', cached)
+    if not cached:
+        with stage('parse'):
+            parsed = _parse(text, now)
+        with _parse_cache_lock:
+            _parse_cache[minute_key if parsed and parsed.source == 'dateparser' else key] = parsed
+            while len(_parse_cache) > PARSE_CACHE_SIZE:
+                _parse_cache.popitem(last=False)
+
+    if parsed and parsed.source == 'clock' and parsed.start <= now:
+        parsed = replace(parsed, start=parsed.start + timedelta(days=1))
+    return parsed
+
+def parse_duration(user_input):
+    """Meeting length stated in the input, in minutes, or None if it states none"""
+    text = user_input.lower()
+    if 'half an hour' in text:
+        return 30
+    match = _LENGTH_RE.search(text)
+    if not match:
+        return None
+    amount = 1.0 if match.group(1) in ('a', 'an') else float(match.group(1))
+    minutes = int(amount * 60) if match.group(2) else int(amount)
+    return minutes or None
+
+def parse_cache_info():
+    """Hit/miss counters and current size of the parse cache"""
+    with _parse_cache_lock:
+        return dict(_parse_cache_stats, size=len(_parse_cache), maxsize=PARSE_CACHE_SIZE)
+
+def clear_parse_cache():
+    with _parse_cache_lock:
+        _parse_cache.clear()
+        _parse_cache_stats['hits'] = _parse_cache_stats['misses'] = 0
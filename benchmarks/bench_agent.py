@@ -0,0 +1,168 @@
+"""Ops per second and Google API calls per op for the agent, against an in-memory calendar.
+
+Covers parsing, slot search on sparse and dense calendars, booking and full
+multi-turn app() conversations. Nothing talks to Google or OpenAI. The
+*_local cases run against the SQLite calendar provider instead of the
+Google client.
+
+Run from the repository root:
+
+    python benchmarks/bench_agent.py
+    python benchmarks/bench_agent.py --save before.json
+    python benchmarks/bench_agent.py --compare before.json --tolerance 0.1
+    python benchmarks/bench_agent.py --only slots
+
+With --compare, a case regresses when its ops/s falls more than --tolerance
+below the saved run or it makes more API calls per op; the exit status is
+then 1.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AGENT_LLM_MODE', 'offline')
+# The in-memory calendar has no quota to protect
+os.environ.setdefault('GOOGLE_API_PROJECT_QPM', '0')
+os.environ.setdefault('GOOGLE_API_USER_QPM', '0')
+
+import pytz
+
+from agent.clients import service_pool
+from agent.calendar import find_available_slots
+from agent.langgraph_agent import app, reset_conversation_state
+from agent.logic import book_appointment, check_availability, parse_natural_time, parse_time_with_duration
+from agent.providers import GoogleCalendarProvider, LocalCalendarProvider, set_provider
+from fake_calendar import FakeCalendarService, populate
+from bench_time_parsing import UTTERANCES
+
+CONVERSATIONS = {
+    'conversation_direct': ["Book a meeting tomorrow at 3 PM", "yes"],
+    'conversation_pick_slot': ["What times are available?", "2", "yes"],
+    'conversation_cancel': ["Schedule a call between 2-4 PM next week", "1", "no"],
+}
+
+def _calendars():
+    return {
+        'sparse': populate(FakeCalendarService(), days=14, events_per_day=2),
+        'dense': populate(FakeCalendarService(), days=14, events_per_day=15),
+    }
+
+def _next_weekday_at(hour):
+    tz = pytz.timezone('Asia/Kolkata')
+    day = datetime.now(tz).date() + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return tz.localize(datetime.combine(day, datetime.min.time()).replace(hour=hour))
+
+def _local_provider(service):
+    """In-memory SQLite provider holding the same events as a fake calendar"""
+    provider = LocalCalendarProvider(':memory:')
+    for _, _, event in service.calendars_by_id.get('primary', []):
+        provider.add_event(event)
+    return provider
+
+def build_cases():
+    """Map case name to (fake calendar, callable running one op, calendar provider)"""
+    calendars = _calendars()
+    empty = FakeCalendarService()
+    google = GoogleCalendarProvider()
+    cases = {}
+
+    cases['parse_natural_time'] = (empty, lambda i: parse_natural_time(UTTERANCES[i % len(UTTERANCES)]))
+    cases['parse_time_with_duration'] = (empty, lambda i: parse_time_with_duration(UTTERANCES[i % len(UTTERANCES)]))
+
+    for name, service in calendars.items():
+        def search(i):
+            now = datetime.now(pytz.timezone('Asia/Kolkata'))
+            return find_available_slots(now, now + timedelta(days=7))
+        cases[f'slots_{name}'] = (service, search)
+
+    # Bookings land on a free hour each time and are rolled back, so every op sees the same calendar
+    booking_calendar = calendars['sparse']
+    booking_time = _next_weekday_at(7)
+    def book(i):
+        result = book_appointment("Book a meeting tomorrow at 7 AM", booking_time)
+        booking_calendar.discard_inserted()
+        return result
+    cases['book_appointment'] = (booking_calendar, book)
+
+    for name, turns in CONVERSATIONS.items():
+        def converse(i, turns=turns, session_id=f'bench-{name}', service=calendars['sparse']):
+            reset_conversation_state(session_id)
+            for text in turns:
+                app(text, session_id)
+            service.discard_inserted()
+        cases[name] = (calendars['sparse'], converse)
+
+    for name, service in calendars.items():
+        cases[f'slots_{name}_local'] = (service, lambda i: check_availability(''), _local_provider(service))
+    cases['conversation_cancel_local'] = (
+        calendars['sparse'], cases['conversation_cancel'][1], _local_provider(calendars['sparse'])
+    )
+
+    return {name: case if len(case) == 3 else case + (google,) for name, case in cases.items()}
+
+def measure(service, op, provider, min_seconds):
+    """Run op until min_seconds have passed; return (ops per second, API calls per op)"""
+    service_pool.put('default', service)
+    set_provider(provider)
+    op(0)  # warm-up, so one-time imports and caches are not timed
+    service.calls.clear()
+
+    ops = 0
+    started = time.perf_counter()
+    while True:
+        op(ops)
+        ops += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return ops / elapsed, service.api_calls() / ops
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0, help="minimum run time per case")
+    parser.add_argument('--only', help="run only cases whose name contains this string")
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="compare against results saved earlier with --save")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed fractional drop in ops/s before flagging a regression")
+    args = parser.parse_args()
+    # Keep the agent's error logs out of the timed loops and the report
+    logging.disable(logging.CRITICAL)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    for name, (service, op, provider) in build_cases().items():
+        if args.only and args.only not in name:
+            continue
+        rate, calls = measure(service, op, provider, args.seconds)
+        results[name] = {'ops_per_s': rate, 'api_calls_per_op': calls}
+
+        line = f"{name:<26} {rate:>12,.1f} ops/s {calls:>8.2f} API calls/op"
+        before = baseline.get(name)
+        if before:
+            line += f"   (before {before['ops_per_s']:,.1f} ops/s, {before['api_calls_per_op']:.2f} calls, x{rate / before['ops_per_s']:.2f})"
+            if rate < before['ops_per_s'] * (1 - args.tolerance) or calls > before['api_calls_per_op'] + 1e-9:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
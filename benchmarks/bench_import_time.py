@@ -0,0 +1,72 @@
+"""Cold-start cost of main.py and frontend/app.py.
+
+Each target is started in a fresh interpreter with -X importtime, so every
+run pays the full import cost. Reports the median wall time and the
+slowest imports of the last run.
+
+Run from the repository root:
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 10 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+TARGETS = {
+    'main.py': "import main",
+    # Streamlit runs the script in bare mode when it is executed without `streamlit run`
+    'frontend/app.py': "import runpy; runpy.run_path('frontend/app.py')",
+}
+
+def run_once(code):
+    """Start a fresh interpreter; return wall seconds and {module: cumulative microseconds}"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, module = line.split('|')
+        cumulative[module.strip()] = int(cumulative_us)
+    return elapsed, cumulative
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="how many of the slowest imports to list")
+    args = parser.parse_args()
+
+    for name, code in TARGETS.items():
+        timings = []
+        for _ in range(args.runs):
+            elapsed, cumulative = run_once(code)
+            timings.append(elapsed)
+
+        print(f"{name}: median {statistics.median(timings) * 1000:.0f} ms over {args.runs} runs "
+              f"(min {min(timings) * 1000:.0f} ms)")
+        heaviest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+        # Only list top-level packages so nested imports are not counted twice
+        shown = 0
+        for module, micros in heaviest:
+            if '.' in module:
+                continue
+            print(f"    {micros / 1000:8.1f} ms  {module}")
+            shown += 1
+            if shown == args.top:
+                break
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Intent classification throughput and accuracy on a corpus of real utterances.
+
+Run from the repository root:
+
+    python benchmarks/bench_intents.py
+    python benchmarks/bench_intents.py --save before.json
+    python benchmarks/bench_intents.py --compare before.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.langgraph_agent import detect_intent
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'utterances.txt')
+
+def load_corpus(path=CORPUS):
+    """(utterance, expected intent) pairs; '#' lines are comments"""
+    pairs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line and not line.startswith('#'):
+                text, expected = line.split('\t')
+                pairs.append((text, expected))
+    return pairs
+
+def measure(func, utterances, min_seconds):
+    """Run func over the corpus until min_seconds have passed; return calls per second"""
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for text in utterances:
+            func(text)
+        calls += len(utterances)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return calls / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="compare against results saved earlier with --save")
+    parser.add_argument('--show-misses', action='store_true', help="list utterances classified differently than expected")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    utterances = [text for text, _ in corpus]
+    misses = [(text, expected, detect_intent(text)) for text, expected in corpus if detect_intent(text) != expected]
+
+    results = {
+        'detect_intent_per_s': measure(detect_intent, utterances, args.seconds),
+        'accuracy': 1 - len(misses) / len(corpus),
+    }
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print(f"{len(corpus)} utterances")
+    for name, value in results.items():
+        line = f"{name:<22} {value:>12,.3f}" if name == 'accuracy' else f"{name:<22} {value:>12,.0f}"
+        if name in baseline:
+            line += f"   (before {baseline[name]:,.3f})"
+        print(line)
+
+    if args.show_misses:
+        for text, expected, got in misses:
+            print(f"    {text!r}: expected {expected}, got {got}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
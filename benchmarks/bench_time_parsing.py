@@ -0,0 +1,99 @@
+"""Parses per second for parse_natural_time and parse_time_with_duration.
+
+Run from the repository root:
+
+    python benchmarks/bench_time_parsing.py
+    python benchmarks/bench_time_parsing.py --save before.json
+    python benchmarks/bench_time_parsing.py --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.logic import parse_natural_time, parse_time_with_duration
+from agent.time_parser import clear_parse_cache
+
+UTTERANCES = [
+    "Book a meeting tomorrow at 3 PM",
+    "Schedule a call between 2-4 PM next week",
+    "I need an appointment next Monday morning",
+    "Do you have any free time this Friday?",
+    "Can we meet today at 5pm",
+    "book a call tomorrow afternoon",
+    "Let's do 10 to 11 am on Wednesday",
+    "schedule a sync at 11:30 am tomorrow",
+    "meeting at 7 o'clock in the evening",
+    "Set up a review next Tuesday between 3-5 pm",
+    "Book something for Thursday",
+    "Call at 9am",
+    "schedule a meeting tomorrow 2-3 pm",
+    "What about next week?",
+]
+
+# Inputs none of the patterns recognise, which fall through to dateparser
+FALLBACK_UTTERANCES = [
+    "Reserve a slot tonight at 8",
+    "sometime after lunch on the 5th",
+]
+
+def measure(func, utterances, min_seconds):
+    """Run func over the corpus until min_seconds have passed; return parses per second"""
+    parses = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm-up pass so one-time costs (dateparser language data) are not timed
+        for text in utterances:
+            func(text)
+        started = time.perf_counter()
+        while True:
+            for text in utterances:
+                func(text)
+            parses += len(utterances)
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds:
+                return parses / elapsed
+
+def uncached(func):
+    """Wrap func so every call misses the parse cache"""
+    def run(text):
+        clear_parse_cache()
+        return func(text)
+    return run
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help="minimum run time per function")
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="compare against results saved earlier with --save")
+    args = parser.parse_args()
+
+    results = {
+        'parse_natural_time': measure(parse_natural_time, UTTERANCES, args.seconds),
+        'parse_time_with_duration': measure(parse_time_with_duration, UTTERANCES, args.seconds),
+        'parse_natural_time_uncached': measure(uncached(parse_natural_time), UTTERANCES, args.seconds),
+        'dateparser_fallback': measure(parse_natural_time, FALLBACK_UTTERANCES, args.seconds),
+        'dateparser_fallback_uncached': measure(uncached(parse_natural_time), FALLBACK_UTTERANCES, args.seconds),
+    }
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    for name, rate in results.items():
+        line = f"{name:<30} {rate:>12,.0f} parses/s"
+        if name in baseline:
+            line += f"   (before {baseline[name]:,.0f}/s, x{rate / baseline[name]:.2f})"
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Local HTTP stand-in for the Google Calendar v3 REST API, with configurable latency.
+
+Serves the requests the agent makes (events list/get/insert, freeBusy, calendar
+get/update) from a FakeCalendarService, optionally failing a share of them
+with 503 backendError or 403 rateLimitExceeded. Point the agent at it with:
+
+    GOOGLE_API_ENDPOINT=http://127.0.0.1:8765/calendar/v3/ GOOGLE_API_ANONYMOUS=1
+
+Run standalone from the repository root:
+
+    python benchmarks/calendar_server.py --port 8765 --latency-ms 80 --jitter-ms 20 --error-rate 0.05
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_calendar import FakeCalendarService, populate
+
+_EVENTS_PATH = re.compile(r"^/calendar/v3/calendars/(?P<calendar>[^/]+)/events$")
+_EVENT_PATH = re.compile(r"^/calendar/v3/calendars/(?P<calendar>[^/]+)/events/(?P<event>[^/]+)$")
+_CALENDAR_PATH = re.compile(r"^/calendar/v3/calendars/(?P<calendar>[^/]+)$")
+_FREEBUSY_PATH = '/calendar/v3/freeBusy'
+
+class CalendarStandIn:
+    """ThreadingHTTPServer serving a FakeCalendarService, sleeping latency +/- jitter per request
+
+    Inserted events are dropped unless keep_inserts is set, so a long run keeps
+    booking against the same calendar. error_rate and rate_limit_rate are the
+    shares of requests answered with 503 backendError and 403
+    rateLimitExceeded, before the request is served.
+    """
+
+    def __init__(self, service=None, host='127.0.0.1', port=0, latency_ms=0.0, jitter_ms=0.0, keep_inserts=False,
+                 error_rate=0.0, rate_limit_rate=0.0):
+        self.service = service or populate(FakeCalendarService())
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.keep_inserts = keep_inserts
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/calendar/v3/"
+
+    def _delay(self):
+        delay_ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def _call(self, request):
+        with self._lock:
+            return request.execute()
+
+    def _injected_error(self):
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return 403, 'rateLimitExceeded', "Rate Limit Exceeded"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503, 'backendError', "Backend Error"
+        return None
+
+    def _dispatch(self, method, path, query, body):
+        """Return (status, payload) for one API request"""
+        injected = self._injected_error()
+        if injected:
+            status, reason, message = injected
+            return status, {'error': {'code': status, 'message': message, 'errors': [{'reason': reason, 'message': message}]}}
+
+        service = self.service
+        params = {key: values[-1] for key, values in query.items()}
+
+        match = _EVENTS_PATH.match(path)
+        if match and method == 'GET':
+            if 'maxResults' in params:
+                params['maxResults'] = int(params['maxResults'])
+            return 200, self._call(service.events().list(calendarId=unquote(match['calendar']), **params))
+        if match and method == 'POST':
+            if body.get('id') and any(
+                entry[2]['id'] == body['id'] for entry in service.calendars_by_id.get(unquote(match['calendar']), [])
+            ):
+                return 409, {'error': {'code': 409, 'message': "The requested identifier already exists.",
+                                       'errors': [{'reason': 'duplicate'}]}}
+            event = self._call(service.events().insert(calendarId=unquote(match['calendar']), body=body))
+            if not self.keep_inserts:
+                with self._lock:
+                    service.discard_inserted()
+            return 200, event
+
+        match = _EVENT_PATH.match(path)
+        if match and method == 'GET':
+            try:
+                return 200, self._call(service.events().get(calendarId=unquote(match['calendar']), eventId=unquote(match['event'])))
+            except KeyError:
+                return 404, {'error': {'code': 404, 'message': "Not Found", 'errors': [{'reason': 'notFound'}]}}
+
+        if path == _FREEBUSY_PATH and method == 'POST':
+            return 200, self._call(service.freebusy().query(body=body))
+
+        match = _CALENDAR_PATH.match(path)
+        if match and method == 'GET':
+            return 200, self._call(service.calendars().get(calendarId=unquote(match['calendar'])))
+        if match and method == 'PUT':
+            return 200, self._call(service.calendars().update(calendarId=unquote(match['calendar']), body=body))
+
+        return 404, {'error': {'code': 404, 'message': f"{method} {path} is not served by the stand-in"}}
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _serve(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                stand_in._delay()
+                try:
+                    status, payload = stand_in._dispatch(self.command, url.path, parse_qs(url.query), body)
+                except Exception as e:
+                    status, payload = 500, {'error': {'code': 500, 'message': str(e)}}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='calendar-stand-in', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="added to every request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="uniform +/- spread around --latency-ms")
+    parser.add_argument('--events-per-day', type=int, default=2, help="busy 30-minute blocks per day for the next two weeks")
+    parser.add_argument('--keep-inserts', action='store_true', help="keep booked events instead of dropping them")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests failed with 503 backendError")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="share of requests failed with 403 rateLimitExceeded")
+    args = parser.parse_args()
+
+    service = populate(FakeCalendarService(), events_per_day=args.events_per_day)
+    stand_in = CalendarStandIn(
+        service, args.host, args.port, args.latency_ms, args.jitter_ms, args.keep_inserts,
+        args.error_rate, args.rate_limit_rate
+    )
+    print(f"Calendar stand-in on {stand_in.endpoint}")
+    try:
+        stand_in._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""In-memory stand-in for the Calendar v3 service used by the benchmarks.
+
+It implements the calls the agent makes (events.list/get/insert, freebusy.query,
+calendars.get/update and batch requests) and counts every executed request
+by endpoint. Install it with:
+
+    from agent.clients import service_pool
+    service_pool.put('default', FakeCalendarService())
+"""
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+import pytz
+
+from agent.intervals import event_bounds, to_epoch
+
+PAGE_SIZE = 250
+
+class _Request:
+    def __init__(self, service, endpoint, run):
+        self._service = service
+        self._endpoint = endpoint
+        self._run = run
+
+    def execute(self, **kwargs):
+        self._service.calls[self._endpoint] += 1
+        return self._run()
+
+class _Events:
+    def __init__(self, service):
+        self._service = service
+
+    def list(self, calendarId='primary', timeMin=None, timeMax=None, pageToken=None, maxResults=PAGE_SIZE, syncToken=None, **kwargs):
+        def run():
+            service = self._service
+            if syncToken is not None:
+                return {'items': [], 'nextSyncToken': syncToken}
+            low = to_epoch(datetime.fromisoformat(timeMin)) if timeMin else float('-inf')
+            high = to_epoch(datetime.fromisoformat(timeMax)) if timeMax else float('inf')
+            items = [
+                body for start, end, body in service.calendars_by_id.get(calendarId, [])
+                if start < high and end > low
+            ]
+            offset = int(pageToken or 0)
+            result = {'items': items[offset:offset + maxResults]}
+            if offset + maxResults < len(items):
+                result['nextPageToken'] = str(offset + maxResults)
+            else:
+                result['nextSyncToken'] = str(len(service.calendars_by_id.get(calendarId, [])))
+            return result
+        return _Request(self._service, 'events.list', run)
+
+    def get(self, calendarId='primary', eventId=None, **kwargs):
+        def run():
+            for _, _, body in self._service.calendars_by_id.get(calendarId, []):
+                if body['id'] == eventId:
+                    return body
+            raise KeyError(eventId)
+        return _Request(self._service, 'events.get', run)
+
+    def insert(self, calendarId='primary', body=None, **kwargs):
+        def run():
+            return self._service.add_event(calendarId, dict(body), inserted=True)
+        return _Request(self._service, 'events.insert', run)
+
+class _FreeBusy:
+    def __init__(self, service):
+        self._service = service
+
+    def query(self, body):
+        def run():
+            low = to_epoch(datetime.fromisoformat(body['timeMin']))
+            high = to_epoch(datetime.fromisoformat(body['timeMax']))
+            calendars = {}
+            for item in body['items']:
+                busy = [
+                    {'start': event['start']['dateTime'], 'end': event['end']['dateTime']}
+                    for start, end, event in self._service.calendars_by_id.get(item['id'], [])
+                    if start < high and end > low
+                ]
+                calendars[item['id']] = {'busy': busy}
+            return {'calendars': calendars}
+        return _Request(self._service, 'freebusy.query', run)
+
+class _Calendars:
+    def __init__(self, service):
+        self._service = service
+
+    def get(self, calendarId='primary'):
+        return _Request(self._service, 'calendars.get', lambda: {'id': calendarId, 'timeZone': self._service.time_zone})
+
+    def update(self, calendarId='primary', body=None):
+        def run():
+            self._service.time_zone = body['timeZone']
+            return dict(body)
+        return _Request(self._service, 'calendars.update', run)
+
+class _Batch:
+    def __init__(self, service, callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request, request_id))
+
+    def execute(self):
+        # One HTTP round trip; the parts are not counted separately
+        self._service.calls['batch'] += 1
+        for request, request_id in self._requests:
+            try:
+                self._callback(request_id, request._run(), None)
+            except Exception as e:
+                self._callback(request_id, None, e)
+
+class FakeCalendarService:
+    """Calendar v3 service backed by Python lists, counting executed requests by endpoint"""
+
+    def __init__(self, time_zone='Asia/Kolkata'):
+        self.time_zone = time_zone
+        self.calendars_by_id = {}
+        self.calls = Counter()
+        self._inserted = []
+        self._next_id = 0
+
+    def events(self):
+        return _Events(self)
+
+    def freebusy(self):
+        return _FreeBusy(self)
+
+    def calendars(self):
+        return _Calendars(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    def add_event(self, calendar_id, body, inserted=False):
+        self._next_id += 1
+        body.setdefault('id', f'evt{self._next_id}')
+        body.setdefault('htmlLink', f"https://calendar.example/event?eid={body['id']}")
+        start, end = event_bounds(body)
+        events = self.calendars_by_id.setdefault(calendar_id, [])
+        events.append((start, end, body))
+        events.sort(key=lambda entry: entry[0])
+        if inserted:
+            self._inserted.append((calendar_id, body['id']))
+        return body
+
+    def discard_inserted(self):
+        """Remove events created through events.insert, so repeated bookings start from the same calendar"""
+        for calendar_id, event_id in self._inserted:
+            self.calendars_by_id[calendar_id] = [
+                entry for entry in self.calendars_by_id[calendar_id] if entry[2]['id'] != event_id
+            ]
+        self._inserted.clear()
+
+    def api_calls(self):
+        return sum(self.calls.values())
+
+def populate(service, days=14, events_per_day=2, calendar_id='primary', seed=0, time_zone='Asia/Kolkata'):
+    """Fill a calendar with 30-minute events on the half-hour grid inside 9:00-18:00, starting today"""
+    rng = random.Random(seed)
+    tz = pytz.timezone(time_zone)
+    today = datetime.now(tz).date()
+    for day in range(days):
+        date = today + timedelta(days=day)
+        for slot in rng.sample(range(18), min(events_per_day, 18)):
+            start = tz.localize(datetime.combine(date, datetime.min.time())) + timedelta(hours=9, minutes=30 * slot)
+            end = start + timedelta(minutes=30)
+            service.add_event(calendar_id, {
+                'summary': 'Busy',
+                'start': {'dateTime': start.isoformat()},
+                'end': {'dateTime': end.isoformat()},
+            })
+    return service
@@ -0,0 +1,233 @@
+"""Concurrent load test of main.fast_app against a local Calendar stand-in and the offline LLM.
+
+Starts the Calendar stand-in in this process and one uvicorn worker serving
+main.fast_app in a subprocess pointed at it. Then, for each scenario and
+concurrency level, simulated users run scripted conversations against
+/chat for --duration seconds. Each user keeps one HTTP connection open and
+starts a new session for every conversation.
+
+Run from the repository root:
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --users 1,16,64 --calendar-latency-ms 120 --save build-a.json
+    python benchmarks/load_test.py --compare build-a.json
+
+Reported per scenario and level: requests, throughput, p50/p95/p99 request
+latency, error rate (transport errors, non-200 and status "error"), and the
+share of replies that did not match the script.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from calendar_server import CalendarStandIn
+from fake_calendar import FakeCalendarService, populate
+
+# (message, text expected in the reply) per turn. Early-morning bookings sit
+# outside the populated 9:00-18:00 events, so they are always free.
+SCENARIOS = {
+    'book_confirm': [
+        ("Book a meeting tomorrow at 8 AM", "is available"),
+        ("yes", "booked successfully"),
+    ],
+    'select_confirm': [
+        ("What times are available?", "available time slots"),
+        ("2", "You've selected"),
+        ("yes", "booked successfully"),
+    ],
+    'book_cancel': [
+        ("Schedule a call tomorrow at 7 AM", "is available"),
+        ("no", "No problem"),
+    ],
+}
+
+def start_server(port, calendar_endpoint, max_workers, log):
+    """Run main.fast_app under one uvicorn worker and wait until /health answers"""
+    env = dict(
+        os.environ,
+        GOOGLE_API_ENDPOINT=calendar_endpoint,
+        GOOGLE_API_ANONYMOUS='1',
+        AGENT_LLM_MODE='offline',
+        LOG_LEVEL='WARNING',
+        AGENT_MAX_WORKERS=str(max_workers),
+        # The stand-in has no quota; set these to test the client-side limits
+        GOOGLE_API_PROJECT_QPM=os.environ.get('GOOGLE_API_PROJECT_QPM', '0'),
+        GOOGLE_API_USER_QPM=os.environ.get('GOOGLE_API_USER_QPM', '0'),
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:fast_app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', '1', '--log-level', 'warning', '--no-access-log'],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30 seconds")
+
+class User(threading.Thread):
+    """One simulated user running a scenario's script in a loop until the deadline"""
+
+    def __init__(self, port, script, deadline, timeout):
+        super().__init__(daemon=True)
+        self.port = port
+        self.script = script
+        self.deadline = deadline
+        self.timeout = timeout
+        self.latencies = []
+        self.errors = 0
+        self.unexpected = 0
+        self.conversations = 0
+
+    def _post(self, conn, message, session_id):
+        body = json.dumps({'user_input': message, 'session_id': session_id})
+        conn.request('POST', '/chat', body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        payload = response.read()
+        return response.status, payload
+
+    def run(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=self.timeout)
+        # Every user finishes at least one conversation, even with a deadline in the past
+        while True:
+            session_id = f'load-{uuid.uuid4().hex}'
+            for message, expected in self.script:
+                started = time.perf_counter()
+                try:
+                    status, payload = self._post(conn, message, session_id)
+                except (OSError, http.client.HTTPException):
+                    self.latencies.append(time.perf_counter() - started)
+                    self.errors += 1
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=self.timeout)
+                    break
+                self.latencies.append(time.perf_counter() - started)
+
+                data = json.loads(payload) if status == 200 else {}
+                if status != 200 or data.get('status') != 'success':
+                    self.errors += 1
+                    break
+                if expected not in data['response']:
+                    self.unexpected += 1
+                    break
+            else:
+                self.conversations += 1
+            if time.monotonic() >= self.deadline:
+                break
+        conn.close()
+
+def run_level(port, script, users, duration, timeout):
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    threads = [User(port, script, deadline, timeout) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for thread in threads for latency in thread.latencies)
+    requests = len(latencies)
+    errors = sum(thread.errors for thread in threads)
+    unexpected = sum(thread.unexpected for thread in threads)
+    if requests >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        'users': users,
+        'requests': requests,
+        'conversations': sum(thread.conversations for thread in threads),
+        'throughput_rps': requests / elapsed,
+        'p50_ms': p50 * 1000,
+        'p95_ms': p95 * 1000,
+        'p99_ms': p99 * 1000,
+        'error_rate': errors / requests if requests else 0.0,
+        'unexpected_rate': unexpected / requests if requests else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', default='1,8,32', help="comma-separated concurrency levels")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per scenario and level")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="comma-separated subset of: " + ', '.join(SCENARIOS))
+    parser.add_argument('--calendar-latency-ms', type=float, default=80.0, help="added to every Calendar API request")
+    parser.add_argument('--calendar-jitter-ms', type=float, default=20.0)
+    parser.add_argument('--calendar-error-rate', type=float, default=0.0, help="share of Calendar requests failed with 503")
+    parser.add_argument('--calendar-rate-limit-rate', type=float, default=0.0, help="share of Calendar requests failed with 403 rateLimitExceeded")
+    parser.add_argument('--events-per-day', type=int, default=4, help="busy blocks per day in the stand-in calendar")
+    parser.add_argument('--max-workers', type=int, default=16, help="AGENT_MAX_WORKERS for the server")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--timeout', type=float, default=30.0, help="per-request client timeout in seconds")
+    parser.add_argument('--server-log', default=os.devnull, help="file for the server's own output")
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="compare against results saved earlier with --save")
+    args = parser.parse_args()
+
+    levels = [int(users) for users in args.users.split(',')]
+    scenarios = args.scenarios.split(',')
+
+    stand_in = CalendarStandIn(
+        populate(FakeCalendarService(), events_per_day=args.events_per_day),
+        latency_ms=args.calendar_latency_ms, jitter_ms=args.calendar_jitter_ms,
+        error_rate=args.calendar_error_rate, rate_limit_rate=args.calendar_rate_limit_rate
+    ).start()
+    server_log = open(args.server_log, 'w')
+    server = start_server(args.port, stand_in.endpoint, args.max_workers, server_log)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    try:
+        print(f"{'scenario':<16}{'users':>6}{'reqs':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'unexp':>8}")
+        for scenario in scenarios:
+            script = SCENARIOS[scenario]
+            # One conversation first, so imports and pooled clients are warm
+            run_level(args.port, script, 1, 0, args.timeout)
+            for users in levels:
+                result = run_level(args.port, script, users, args.duration, args.timeout)
+                key = f'{scenario}@{users}'
+                results[key] = result
+                line = (f"{scenario:<16}{users:>6}{result['requests']:>8}{result['throughput_rps']:>9.1f}"
+                        f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                        f"{result['error_rate']:>8.1%}{result['unexpected_rate']:>8.1%}")
+                before = baseline.get(key)
+                if before:
+                    line += (f"   (before {before['throughput_rps']:.1f} req/s, p95 {before['p95_ms']:.1f} ms; "
+                             f"x{result['throughput_rps'] / before['throughput_rps']:.2f} req/s)")
+                print(line)
+    finally:
+        server.terminate()
+        server.wait()
+        server_log.close()
+        stand_in.stop()
+
+    if args.save:
+        config = {key: value for key, value in vars(args).items() if key not in ('save', 'compare')}
+        with open(args.save, 'w') as f:
+            json.dump({'config': config, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,15 @@
+import logging
 import os
 import sys
+import uuid
 import streamlit as st
 
 # ✅ Add parent directory to sys.path to resolve import issue
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from agent.langgraph_agent import app
+from agent.langgraph_agent import app, reset_conversation_state
+
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
 
 st.set_page_config(page_title="🧑‍💼 AI Booking Assistant", layout="wide")
 
@@ -45,6 +49,10 @@ with st.expander("💡 Example queries you can try:", expanded=False):
     - "What times are available this week?"
     """)
 
+# Each browser tab gets its own conversation state on the agent side
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+
 # Initialize chat history
 if "messages" not in st.session_state:
     st.session_state["messages"] = [
@@ -66,7 +74,7 @@ if prompt := st.chat_input("Ask me to book a calendar event or check availabilit
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
             try:
-                response = app(prompt)
+                response = app(prompt, st.session_state["session_id"])
                 st.markdown(response)
                 st.session_state["messages"].append({"role": "assistant", "content": response})
             except Exception as e:
@@ -93,6 +101,7 @@ with st.sidebar:
     """)
 
     if st.button("🔄 Clear Chat History"):
+        reset_conversation_state(st.session_state["session_id"])
         st.session_state["messages"] = [
             {"role": "assistant", "content": "Hello! I'm your AI booking assistant. I can help you schedule appointments on your Google Calendar. What would you like to schedule today?"}
         ]
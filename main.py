@@ -34,17 +34,71 @@
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from agent.langgraph_agent import app
-import uvicorn
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+import pytz
+from agent.langgraph_agent import app_async, app_stream, reset_conversation_state_async, run_blocking
+from agent.logic import book_appointments_batch, find_common_slots
+from agent.session import DEFAULT_SESSION
+from agent.metrics import render as render_metrics
+
+# Per-turn diagnostics are logged at DEBUG; set LOG_LEVEL=DEBUG to see them
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 class UserInput(BaseModel):
     user_input: str
+    session_id: str = DEFAULT_SESSION
+
+class SessionRequest(BaseModel):
+    session_id: str = DEFAULT_SESSION
 
 class ChatResponse(BaseModel):
     response: str
     status: str = "success"
 
+class BatchBookingItem(BaseModel):
+    title: str = "Meeting via AI Booking Agent"
+    start_time: datetime
+    duration_minutes: int = 30
+    description: str = ""
+
+class BatchBookingRequest(BaseModel):
+    bookings: List[BatchBookingItem]
+
+class BatchBookingResult(BaseModel):
+    index: int
+    status: str
+    start_time: datetime
+    event_link: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchBookingResponse(BaseModel):
+    results: List[BatchBookingResult]
+    booked: int
+    conflicts: int
+    status: str = "success"
+
+class CommonAvailabilityRequest(BaseModel):
+    attendees: List[str]
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    duration_minutes: int = 30
+    limit: int = 5
+
+class CommonSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+class CommonAvailabilityResponse(BaseModel):
+    slots: List[CommonSlot]
+    unreadable: Dict[str, str] = {}
+    status: str = "success"
+
 fast_app = FastAPI(
     title="AI Booking Agent API",
     description="API for AI-powered calendar booking assistant",
@@ -66,7 +120,11 @@ async def root():
         "message": "AI Booking Agent API is running!",
         "endpoints": {
             "/chat": "POST - Send chat messages to the booking agent",
-            "/health": "GET - Check API health status"
+            "/chat/stream": "POST - Same as /chat, streamed as Server-Sent Events",
+            "/book/batch": "POST - Book many appointments in one request",
+            "/availability/common": "POST - Find times when several people are all free",
+            "/health": "GET - Check API health status",
+            "/metrics": "GET - Prometheus metrics"
         }
     }
 
@@ -74,10 +132,16 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "AI Booking Agent"}
 
+@fast_app.get("/metrics")
+async def metrics():
+    """Stage latencies, Google API and LLM call counts, and cache hits in the Prometheus text format"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @fast_app.post("/chat", response_model=ChatResponse)
 async def chat(data: UserInput):
     try:
-        response = app(data.user_input)
+        response = await app_async(data.user_input, data.session_id)
         return ChatResponse(response=response, status="success")
     except Exception as e:
         return ChatResponse(
@@ -85,12 +149,65 @@ async def chat(data: UserInput):
             status="error"
         )
 
+@fast_app.post("/chat/stream")
+async def chat_stream(data: UserInput):
+    """Stream a chat turn as Server-Sent Events: progress, slot and token events, then done"""
+    async def events():
+        try:
+            async for event in app_stream(data.user_input, data.session_id):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            error = {'type': 'error', 'response': f"Sorry, I encountered an error: {str(e)}. Please try again."}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@fast_app.post("/book/batch", response_model=BatchBookingResponse)
+async def book_batch(data: BatchBookingRequest):
+    """Check every booking against one availability snapshot and insert the free ones in batch requests"""
+    entries = [
+        {
+            'title': item.title,
+            'start_time': item.start_time,
+            'duration': item.duration_minutes,
+            'description': item.description
+        }
+        for item in data.bookings
+    ]
+    try:
+        results = await run_blocking(book_appointments_batch, entries)
+    except Exception as e:
+        return BatchBookingResponse(results=[], booked=0, conflicts=0, status=f"error: {e}")
+    return BatchBookingResponse(
+        results=[BatchBookingResult(**result) for result in results],
+        booked=sum(result['status'] == 'booked' for result in results),
+        conflicts=sum(result['status'] == 'conflict' for result in results)
+    )
+
+@fast_app.post("/availability/common", response_model=CommonAvailabilityResponse)
+async def common_availability(data: CommonAvailabilityRequest):
+    """Earliest slots when the organizer and every attendee are free, from one bulk free/busy read"""
+    kolkata_tz = pytz.timezone('Asia/Kolkata')
+    start = data.start or datetime.now(kolkata_tz)
+    start = kolkata_tz.localize(start) if start.tzinfo is None else start.astimezone(kolkata_tz)
+    end = data.end or start + timedelta(days=7)
+    end = kolkata_tz.localize(end) if end.tzinfo is None else end.astimezone(kolkata_tz)
+    try:
+        found = await run_blocking(find_common_slots, start, end, data.attendees, data.duration_minutes, data.limit)
+    except Exception as e:
+        return CommonAvailabilityResponse(slots=[], status=f"error: {e}")
+    return CommonAvailabilityResponse(
+        slots=[CommonSlot(start=slot, end=slot + timedelta(minutes=data.duration_minutes)) for slot in found.slots],
+        unreadable=found.unreadable
+    )
+
 @fast_app.post("/reset")
-async def reset_conversation():
-    """Reset the conversation state"""
-    from agent.langgraph_agent import reset_conversation_state
-    reset_conversation_state()
-    return {"message": "Conversation state reset successfully"}
+async def reset_conversation(data: Optional[SessionRequest] = None):
+    """Reset the conversation state for one session"""
+    session_id = data.session_id if data else DEFAULT_SESSION
+    await reset_conversation_state_async(session_id)
+    return {"message": "Conversation state reset successfully", "session_id": session_id}
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(fast_app, host="0.0.0.0", port=8000)
@@ -0,0 +1,41 @@
+import os
+import sys
+from datetime import datetime, timedelta
+import pytz
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from fake_calendar import FakeCalendarService, _Batch
+from agent import google_api
+from agent.clients import service_pool
+from agent.logic import book_appointments_batch
+
+class _FailingBatch(_Batch):
+    def execute(self):
+        self._service.batches_sent += 1
+        if self._service.batches_sent == self._service.fail_batch:
+            raise OSError("connection reset")
+        super().execute()
+
+class _Service(FakeCalendarService):
+    batches_sent = 0
+    fail_batch = 2
+
+    def new_batch_http_request(self, callback=None):
+        return _FailingBatch(self, callback)
+
+def test_batch_keeps_results_of_chunks_sent_before_a_failed_one(monkeypatch):
+    monkeypatch.setattr(google_api, '_user_buckets', {})
+    monkeypatch.setattr(google_api, 'GOOGLE_API_USER_QPM', 0)
+    monkeypatch.setattr(google_api, '_project_bucket', None)
+    service = _Service()
+    service_pool.put('default', service)
+
+    start = datetime.now(pytz.timezone('Asia/Kolkata')).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    entries = [{'title': f"Meeting {i}", 'start_time': start + timedelta(hours=i)} for i in range(60)]
+    results = book_appointments_batch(entries)
+
+    assert [result['status'] for result in results] == ['booked'] * 50 + ['error'] * 10
+    assert all(result['event_link'] for result in results[:50])
+    assert len(service.calendars_by_id['primary']) == 50
+    ids = [body['id'] for _, _, body in service.calendars_by_id['primary']]
+    assert len(set(ids)) == 50 and not any(event_id.startswith('evt') for event_id in ids)
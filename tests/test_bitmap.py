@@ -0,0 +1,25 @@
+from datetime import datetime
+import pytz
+from agent.bitmap import find_free_slots
+
+def _day_slots(time_zone, step_minutes):
+    tz = pytz.timezone(time_zone)
+    midnight = tz.localize(datetime(2026, 10, 19))  # a Monday
+    window_start = int(midnight.timestamp())
+    slots = find_free_slots([[]], window_start, window_start + 86400, 30, tz, step_minutes=step_minutes)
+    return [slot.strftime('%H:%M') for slot in slots]
+
+def test_hourly_steps_start_on_the_hour():
+    assert _day_slots('Asia/Kolkata', 60)[:3] == ['09:00', '10:00', '11:00']
+
+def test_grid_follows_local_opening_time():
+    assert _day_slots('Asia/Kathmandu', 45)[:3] == ['09:00', '09:45', '10:30']
+    assert _day_slots('America/New_York', 30)[:3] == ['09:00', '09:30', '10:00']
+
+def test_meetings_may_run_past_closing_time_as_in_the_index_engine():
+    tz = pytz.timezone('Asia/Kolkata')
+    midnight = tz.localize(datetime(2026, 10, 19))
+    window_start = int(midnight.timestamp())
+    busy = [(window_start + 9 * 3600, window_start + 17 * 3600)]
+    slots = find_free_slots([busy], window_start, window_start + 86400, 60, tz)
+    assert [slot.strftime('%H:%M') for slot in slots] == ['17:00', '17:30']
@@ -0,0 +1,47 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from fake_calendar import FakeCalendarService, _FreeBusy, populate
+from agent import langgraph_agent, logic
+from agent.clients import service_pool
+from agent.langgraph_agent import app
+
+UNREADABLE = 'bob@external.com'
+
+class _PartlyReadableFreeBusy(_FreeBusy):
+    def query(self, body):
+        request = super().query(body)
+        read = request._run
+
+        def run():
+            result = read()
+            if UNREADABLE in result['calendars']:
+                result['calendars'][UNREADABLE] = {'errors': [{'domain': 'global', 'reason': 'notFound'}], 'busy': []}
+            return result
+        request._run = run
+        return request
+
+class _Service(FakeCalendarService):
+    def freebusy(self):
+        return _PartlyReadableFreeBusy(self)
+
+def test_group_booking_completes_when_an_attendee_calendar_is_unreadable(monkeypatch):
+    service = populate(_Service())
+    populate(service, calendar_id='alice@example.com', seed=1)
+    service_pool.put('default', service)
+    # Every snapshot counts as stale, so the confirmation re-checks the calendars
+    monkeypatch.setattr(logic, 'SNAPSHOT_MAX_AGE_SECONDS', -1)
+    monkeypatch.setattr(langgraph_agent, 'PREFETCH_ENABLED', False)
+    session = 'test-unreadable-attendee'
+
+    reply = app(f"Find a time next week when alice@example.com and {UNREADABLE} are free", session)
+    assert UNREADABLE in reply and "1." in reply
+    assert "Shall I" in app("1", session)
+
+    service.calls.clear()
+    reply = app("yes", session)
+    assert reply.startswith("✅"), reply
+    assert service.calls['freebusy.query'] == 1 and service.calls['events.insert'] == 1
+    event = [body for _, _, body in service.calendars_by_id['primary'] if body.get('attendees')][-1]
+    assert [attendee['email'] for attendee in event['attendees']] == ['alice@example.com', UNREADABLE]
@@ -0,0 +1,42 @@
+import threading
+from datetime import date, datetime, timedelta
+import pytz
+from agent import policy
+from agent.calendar import event_body
+from agent.policy import DEFAULT_POLICY, SchedulingPolicy, get_policy, set_policy
+
+def _run_with_timeout(target, seconds=5):
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(seconds)
+    return not worker.is_alive()
+
+def test_set_policy_before_first_lookup(monkeypatch):
+    monkeypatch.setattr(policy, '_policies', None)
+    rooms = SchedulingPolicy(timezone='Europe/Berlin', start_hour=8)
+
+    assert _run_with_timeout(lambda: set_policy('rooms@example.com', rooms)), "set_policy deadlocked"
+    assert get_policy('rooms@example.com') is rooms
+    assert get_policy('someone@example.com') is DEFAULT_POLICY
+
+def test_set_policy_replaces_default(monkeypatch):
+    monkeypatch.setattr(policy, '_policies', None)
+    default = SchedulingPolicy(buffer_minutes=10)
+
+    set_policy(None, default)
+    assert get_policy() is default
+    assert get_policy('primary') is default
+
+def test_working_hours_keep_wall_clock_on_dst_change_days():
+    new_york = SchedulingPolicy(timezone='America/New_York', end_hour=10, step_minutes=60, workdays=(6,))
+    for sunday in (date(2027, 3, 14), date(2026, 11, 1)):
+        starts = policy.week_grid(new_york, sunday - timedelta(days=6))
+        assert [datetime.fromtimestamp(start, new_york.tzinfo).strftime('%H:%M') for start in starts] == ['09:00']
+
+def test_booking_uses_the_policy_timezone(monkeypatch):
+    monkeypatch.setattr(policy, '_policies', None)
+    set_policy(None, SchedulingPolicy(timezone='Europe/Berlin'))
+
+    body = event_body("Sync", "", pytz.utc.localize(datetime(2026, 10, 19, 8)), 60)
+    assert body['start'] == {'dateTime': '2026-10-19T10:00:00', 'timeZone': 'Europe/Berlin'}
+    assert body['end'] == {'dateTime': '2026-10-19T11:00:00', 'timeZone': 'Europe/Berlin'}
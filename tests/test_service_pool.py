@@ -0,0 +1,48 @@
+import threading
+from google.auth.credentials import AnonymousCredentials
+from agent import clients
+from agent.clients import ServicePool
+
+def test_pool_size_counts_accounts_not_threads(monkeypatch):
+    monkeypatch.setattr(clients, '_load_credentials', lambda account: AnonymousCredentials())
+    pool = ServicePool(max_size=2)
+    services = []
+    # Every worker stays alive until all have a service, so no thread id is reused
+    together = threading.Barrier(20)
+
+    def work():
+        services.append(pool.get('a'))
+        together.wait(5)
+    workers = [threading.Thread(target=work) for _ in range(20)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    pool.get('b')
+
+    assert len(pool._entries['a'].services) == 20 and len(set(map(id, services))) == 20
+    pool.get('c')
+    assert list(pool._entries) == ['b', 'c']
+
+def test_slow_sign_in_blocks_only_its_own_account(monkeypatch):
+    signing_in = threading.Event()
+    release = threading.Event()
+
+    def load(account):
+        if account == 'slow':
+            signing_in.set()
+            release.wait(5)
+        return AnonymousCredentials()
+    monkeypatch.setattr(clients, '_load_credentials', load)
+    pool = ServicePool()
+    slow = threading.Thread(target=pool.get, args=('slow',), daemon=True)
+    slow.start()
+    signing_in.wait(5)
+
+    fast = threading.Thread(target=pool.get, args=('fast',), daemon=True)
+    fast.start()
+    fast.join(2)
+    blocked = fast.is_alive()
+    release.set()
+    slow.join(5)
+    assert not blocked, "one account's sign-in blocked another account"